@@ -0,0 +1,188 @@
+import os
+from Clump import ClumpPositions
+from Replication import FrequencyTable
+"""
+Batch driver for ClumpFinding and FrequentWords over many genomes at once (a list
+of sequences, (name, sequence) pairs, or a multi-record FASTA or FASTQ file), with
+the work fanned out over a pool of Workers processes.
+
+Each genome is copied once into its own block of shared memory (one latin-1 byte
+per letter), so a task only sends the name of the block and the range of letters to
+scan, and workers read the letters straight from it. Genomes are read one at a time
+and only a bounded number of tasks are in flight, so a FASTA file of hundreds of
+assemblies is never held in memory as a whole. Results come back as each genome
+completes, not in input order.
+
+A very long chromosome can be split into segments of SegmentSize letters. Each
+segment is scanned together with the L - 1 letters that follow it (k - 1 for
+FrequentWords), so every window of length L (every k-mer) starting in the segment is
+seen whole by exactly one task, and merging the segments gives the same answer as
+scanning the chromosome in one go.
+"""
+
+"""
+input:  Genomes- path to a FASTA or FASTQ file, or an iterable of sequences or of
+        (name, sequence) pairs; a sequence given on its own is named by its position
+output: generator yielding (name, sequence) pairs
+"""
+def NamedGenomes(Genomes):
+    if isinstance(Genomes, str):
+        from SequenceReader import ReadSequences
+        yield from ReadSequences(Genomes)
+        return
+    for position, Genome in enumerate(Genomes):
+        if isinstance(Genome, tuple):
+            yield Genome
+        else:
+            yield position, Genome
+
+"""
+input:  integers n (length of the genome), Span (length of a window, L or k) and
+        SegmentSize (number of windows per segment, None for a single segment)
+output: list of (start, stop) letter ranges to scan; consecutive ranges overlap by
+        Span - 1 letters, and the windows starting in range i are those starting at
+        start to stop - Span
+        ex: Segments(10, 3, 4)
+            [(0, 6), (4, 10)]
+"""
+def Segments(n, Span, SegmentSize=None):
+    windows = n - Span + 1
+    if windows <= 0:
+        return [(0, n)]
+    if SegmentSize is None:
+        SegmentSize = windows
+    SegmentSize = max(1, SegmentSize)
+    return [(start, min(start + SegmentSize, windows) + Span - 1)
+            for start in range(0, windows, SegmentSize)]
+
+# the scan run on one segment, and how the segments of a genome are merged
+def _SegmentClumps(Text, Start, k, t, L, Backend):
+    return {Pattern: Start + position for Pattern, position in ClumpPositions(Text, k, t, L, 1, Backend).items()}
+
+def _MergeClumps(Parts):
+    positions = {}
+    for part in Parts:
+        for Pattern, position in part.items():
+            if Pattern not in positions or position < positions[Pattern]:
+                positions[Pattern] = position
+    return {Pattern: positions[Pattern] for Pattern in sorted(positions)}
+
+def _SegmentFrequencies(Text, Start, k):
+    return FrequencyTable(Text, k)
+
+def _MergeFrequentWords(Parts):
+    Table = {}
+    # segments in genome order, so the keys stay in order of first appearance
+    for part in Parts:
+        for Pattern, count in part.items():
+            Table[Pattern] = Table.get(Pattern, 0) + count
+    if not Table:
+        return []
+    m = max(Table.values())
+    return [Pattern for Pattern in Table if Table[Pattern] == m]
+
+# read the letters of one segment out of shared memory, and scan them
+def _ScanShared(Name, Start, Stop, Scan, Arguments):
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(name=Name)
+    try:
+        Text = bytes(memory.buf[Start:Stop]).decode('latin-1')
+    finally:
+        memory.close()
+    return Scan(Text, Start, *Arguments)
+
+"""
+Runs Scan on every segment of every genome and yields (name, Merge(list of segment
+results in genome order)) as each genome completes. Span is the number of letters
+consecutive segments share plus one.
+"""
+def _RunBatch(Genomes, Span, Scan, Merge, Arguments, Workers, SegmentSize):
+    if Workers is None:
+        Workers = os.cpu_count() or 1
+    if Workers <= 1:
+        for name, Genome in NamedGenomes(Genomes):
+            Genome = str(Genome)
+            yield name, Merge([Scan(Genome[start:stop], start, *Arguments)
+                               for start, stop in Segments(len(Genome), Span, SegmentSize)])
+        return
+    import concurrent.futures
+    from multiprocessing import shared_memory
+    # tasks waiting for a worker, so that genomes are only read as fast as they are scanned
+    limit = 4 * Workers
+    jobs = {}
+    futures = {}
+    genomes = iter(NamedGenomes(Genomes))
+    with concurrent.futures.ProcessPoolExecutor(Workers) as pool:
+        try:
+            while True:
+                while len(futures) < limit:
+                    name, Genome = next(genomes, (None, None))
+                    if Genome is None:
+                        break
+                    raw = str(Genome).encode('latin-1', 'replace')
+                    memory = shared_memory.SharedMemory(create=True, size=max(len(raw), 1))
+                    memory.buf[:len(raw)] = raw
+                    segments = Segments(len(raw), Span, SegmentSize)
+                    jobs[memory.name] = [name, memory, [None] * len(segments), len(segments)]
+                    for i, (start, stop) in enumerate(segments):
+                        future = pool.submit(_ScanShared, memory.name, start, stop, Scan, Arguments)
+                        futures[future] = (memory.name, i)
+                if not futures:
+                    break
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    key, i = futures.pop(future)
+                    job = jobs[key]
+                    job[2][i] = future.result()
+                    job[3] -= 1
+                    if job[3] == 0:
+                        del jobs[key]
+                        job[1].close()
+                        job[1].unlink()
+                        yield job[0], Merge(job[2])
+        finally:
+            for future in futures:
+                future.cancel()
+            for job in jobs.values():
+                job[1].close()
+                job[1].unlink()
+
+"""
+ClumpPositions (see Clump.py) for every genome.
+
+input:  Genomes- see NamedGenomes; integers k, t and L
+        Workers- number of processes (None for every core, 1 to run in this process)
+        SegmentSize- number of windows of length L per task, None for one task per genome
+        Backend- frequency table for every segment (see Frequencies in Clump.py),
+        None to pick one from the length of each segment
+output: generator yielding (name, clump positions) as each genome completes
+"""
+def BatchClumpPositions(Genomes, k, t, L, Workers=None, SegmentSize=None, Backend=None):
+    return _RunBatch(Genomes, L, _SegmentClumps, _MergeClumps, (k, t, L, Backend), Workers, SegmentSize)
+
+"""
+ClumpFinding (see Clump.py) for every genome.
+
+output: generator yielding (name, list of clump-forming k-mers in lexicographic
+        order) as each genome completes
+        ex: for name, clumps in BatchClumpFinding("genomes.fa", 9, 3, 500):
+                print(name, len(clumps))
+"""
+def BatchClumpFinding(Genomes, k, t, L, Workers=None, SegmentSize=None):
+    for name, positions in BatchClumpPositions(Genomes, k, t, L, Workers, SegmentSize):
+        yield name, list(positions)
+
+"""
+FrequentWords (see Replication.py) for every genome; segments overlap by k - 1
+letters and their frequency tables are added up.
+
+input:  Genomes- see NamedGenomes; integer k, Workers and SegmentSize (number of
+        k-mers per task) as for BatchClumpPositions
+output: generator yielding (name, list of most frequent k-mers in order of first
+        appearance) as each genome completes
+"""
+def BatchFrequentWords(Genomes, k, Workers=None, SegmentSize=None):
+    return _RunBatch(Genomes, k, _SegmentFrequencies, _MergeFrequentWords, (k,), Workers, SegmentSize)
+
+# for name, clumps in BatchClumpFinding("upstream250.txt", 5, 3, 50, Workers=4):
+#     print(name, clumps)
@@ -1,4 +1,6 @@
+import itertools
 import math
+from array import array
 """
 Clump Finding Problem: Find patterns forming clumps in a string.
 
@@ -90,7 +92,7 @@ def IndexToPattern(index, k):
     while (quotient > 0):
         remainder = quotient % 4
         numbers.append(remainder)
-        quotient = math.floor(quotient / 4)
+        quotient = quotient // 4
     if (quotient != 0):
         numbers = numbers + [quotient]
     numbers.reverse()
@@ -103,26 +105,480 @@ def IndexToPattern(index, k):
 
 # print(IndexToPattern(5437, 8))
 
+"""
+ReverseComplement (see Replication.py) for a base 4 index without going through a
+string. With A = 0, C = 1, G = 2, T = 3 the complement of a letter is 3 minus it,
+i.e. XOR with 3, so 255 - byte complements the 4 letters of a byte at once.
+ReverseComplementByte holds the reverse complement of every 4-letter index (one
+byte), so a k-mer index is reversed one byte at a time.
+
+input:  integers index and k
+        ex: PatternToIndex('ATGATCAAG'), 9
+output: index of the reverse complement
+        ex: PatternToIndex('CTTGATCAT')
+"""
+ReverseComplementByte = [PatternToIndex(IndexToPattern(255 - byte, 4)[::-1]) for byte in range(256)]
+
+def ReverseComplementIndex(index, k):
+    result = 0
+    for _ in range((k + 3) // 4):
+        # the last 4 letters of index become the first 4 of the result
+        result = (result << 8) | ReverseComplementByte[index & 255]
+        index >>= 8
+    # drop the letters that came from padding k up to a multiple of 4
+    return result >> (2 * (-k % 4))
+
+"""
+Calling PatternToIndex on every k-mer of a genome redoes O(k) work at every position
+even though neighbouring k-mers share k-1 letters. Since each letter takes exactly
+2 bits in base 4, we can instead roll the index along the text:
+
+    next index = ((index << 2) | LetterToNumber(next letter)) & (4^k - 1)
+
+Shifting left by 2 bits multiplies by 4 and makes room for the new letter, and the
+mask 4^k - 1 drops the letter that just slid out of the window. Each position costs
+O(1) regardless of k.
+
+Text can be any iterable of letters (a string, a PackedGenome, or a chain of chunks
+read from disk). Letters other than A, C, G and T (the N runs of an assembly) have
+no index. With Errors="skip" every k-mer that overlaps one is left out: the window
+starts filling again after the letter. With Errors="strict" a ValueError is raised.
+
+input:  Text- DNA string (or iterable of letters), integer k, and Errors- "skip" or
+        "strict"
+        ex: "AGTC", 2
+output: generator yielding PatternToIndex of every k-mer of Text, in order
+        ex: 2 11 13
+        ex: "AGNTCA", 2 gives 2 13 4 (AG TC CA, no GN or NT)
+"""
+Base4 = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+def RollingPatternToIndex(Text, k, Errors="skip"):
+    CheckErrors(Errors)
+    mask = 4**k - 1
+    index = 0
+    # number of letters read since the start or the last letter without an index,
+    # until the first full window
+    filled = 0
+    for Letter in Text:
+        number = Base4.get(Letter)
+        if number is None:
+            if Errors == "strict":
+                raise ValueError("invalid nucleotide " + repr(Letter))
+            filled = 0
+            continue
+        index = ((index << 2) | number) & mask
+        if filled < k - 1:
+            filled += 1
+        else:
+            yield index
+
+# print(list(RollingPatternToIndex("AGTC", 2)))
+# print(list(RollingPatternToIndex("AGNTCA", 2)))
+
+def CheckErrors(Errors):
+    if Errors not in ("skip", "strict"):
+        raise ValueError("Errors must be 'skip' or 'strict', not " + repr(Errors))
+
+"""
+Same as RollingPatternToIndex with Errors="skip", but aligned with the positions of
+Text: one value for every window of k letters, None for a window that overlaps a
+letter other than A, C, G and T. ClumpPositions runs two of these a fixed distance
+apart, which needs every window, skipped or not.
+
+output: generator yielding PatternToIndex or None for every window of Text, in order
+        ex: "AGNTCA", 2 gives 2 None None 13 4
+"""
+def RollingWindowIndex(Text, k):
+    mask = 4**k - 1
+    index = 0
+    read = 0
+    # letters with an index in a row, up to the current one
+    run = 0
+    for Letter in Text:
+        number = Base4.get(Letter)
+        if number is None:
+            run = 0
+        else:
+            index = ((index << 2) | number) & mask
+            run += 1
+        if read < k - 1:
+            read += 1
+        else:
+            yield index if run >= k else None
+
+"""
+A k-mer and its reverse complement are the same piece of double stranded DNA, read
+from either strand. Canonical counting keeps one code per pair, the smaller of the
+two indices (which, with A < C < G < T, is the alphabetically first of the two
+strings), so a table keyed by canonical codes needs about half the entries.
+
+The index of the reverse complement can be rolled along Text as well: each new
+letter is complemented (3 - number) and enters at the top 2 bits, while the letters
+already there shift 2 bits down and the lowest one falls off:
+
+    next reverse = (reverse >> 2) | ((3 - number) << 2(k-1))
+
+input:  Text- DNA string (or iterable of letters), integer k, and Errors as in
+        RollingPatternToIndex
+        ex: "AGTC", 2
+output: generator yielding (index, index of the reverse complement) for every k-mer
+        of Text, in order
+        ex: (2, 7) (11, 1) (13, 8)
+"""
+def RollingIndexPairs(Text, k, Errors="skip"):
+    CheckErrors(Errors)
+    mask = 4**k - 1
+    shift = 2 * max(k - 1, 0)
+    index = 0
+    reverse = 0
+    filled = 0
+    for Letter in Text:
+        number = Base4.get(Letter)
+        if number is None:
+            if Errors == "strict":
+                raise ValueError("invalid nucleotide " + repr(Letter))
+            filled = 0
+            continue
+        index = ((index << 2) | number) & mask
+        reverse = ((reverse >> 2) | ((3 - number) << shift)) & mask
+        if filled < k - 1:
+            filled += 1
+        else:
+            yield index, reverse
+
+"""
+input:  Text- DNA string (or iterable of letters) and integer k
+        ex: "AGTC", 2
+output: iterator over the canonical index min(index, reverse complement index) of
+        every k-mer of Text, in order
+        ex: 2 1 8
+"""
+def RollingCanonicalIndex(Text, k, Errors="skip"):
+    return map(min, RollingIndexPairs(Text, k, Errors))
+
+# print(list(RollingCanonicalIndex("AGTC", 2)))
+
+"""
+Vectorized version of RollingPatternToIndex using NumPy: every letter is mapped to
+its base 4 number with a lookup table, and the k shifted copies of that array are
+OR-ed together so that the indices of all k-mers come out in one array. NumPy is
+only imported when this function is called.
+
+input:  Text- DNA string, integer k (k <= 32 so that an index fits in 64 bits), and
+        Errors as in RollingPatternToIndex
+output: numpy uint64 array with PatternToIndex of every k-mer of Text, leaving out
+        (with Errors="skip") the k-mers that overlap a letter other than A, C, G and T
+"""
+def PatternToIndexArray(Text, k, Errors="skip"):
+    import numpy as np
+    CheckErrors(Errors)
+    if k > 32:
+        raise ValueError("k must be at most 32 to fit in a uint64")
+    lookup = np.full(256, 255, dtype=np.uint8)
+    for Letter, number in Base4.items():
+        lookup[ord(Letter)] = number
+    numbers = lookup[np.frombuffer(Text.encode('latin-1'), dtype=np.uint8)]
+    invalid = numbers == 255
+    if invalid.any() and Errors == "strict":
+        raise ValueError("invalid nucleotide in Text")
+    count = len(numbers) - k + 1
+    indices = np.zeros(max(count, 0), dtype=np.uint64)
+    for j in range(k):
+        indices |= (numbers[j:j+count] & 3).astype(np.uint64) << np.uint64(2*(k-1-j))
+    if invalid.any() and count > 0:
+        # a window is kept when it holds no invalid letter, by prefix sums of them
+        seen = np.concatenate(([0], np.cumsum(invalid)))
+        indices = indices[seen[k:] == seen[:count]]
+    return indices
+
+"""
+A frequency array of 4^k counts stops being practical as k grows: at k = 12 a
+Python list of 4^k ints is 16.7 million boxed entries, and past k = 13 it does not
+fit in memory, while a genome of n letters only ever holds at most n - k + 1
+distinct k-mers. So the counts are kept in one of two tables with the same methods:
+
+    DenseFrequencies   a typed array of 4^k unsigned 32 bit counts, indexed directly
+                       by PatternToIndex: 4 bytes per possible k-mer (or per
+                       canonical index, about half as many, see CanonicalSlot)
+    SparseFrequencies  an open addressing hash table of (index, count) pairs in two
+                       typed arrays, probed linearly: about 24 bytes per k-mer that
+                       actually occurs, at most half full
+
+Frequencies picks the dense table when its number of entries (4^k, or the number of
+canonical indices) is small, or at most 8 times the number of k-mers that will be
+counted (Size, around where both tables take the same memory), and the sparse table
+otherwise.
+
+Both tables also remember k and whether indices are canonical (see
+RollingCanonicalIndex), so that Serialize can write the old frequency array text.
+"""
+# 4^k up to which the dense table is always used (256 KB of counts)
+DenseMinimum = 1 << 16
+# 4^k above which the dense table is never picked automatically (256 MB of counts)
+DenseLimit = 1 << 26
+
+"""
+A canonical index is at most its reverse complement index, so only about half of the
+4^k indices are ever counted. CanonicalSlot numbers them 0, 1, 2, ... without a
+lookup table over all 4^k indices. Split a k-mer into its left half L, for odd k a
+middle letter M, and its right half R, each half m = k // 2 letters, and let
+u = ReverseComplementIndex(R, m). The reverse complement of (L, M, R) is
+(u, 3 - M, ReverseComplementIndex(L, m)), so the k-mer is canonical when L < u, or
+L = u and M is A or C (for even k, L = u is a palindrome). Ordered by u, then L, then
+M, the canonical indices fill
+
+    even k   slot = u (u + 1) / 2 + L          (4^k + 2^k) / 2 slots
+    odd k    slot = 2 u^2 + 4 L + M            4^k / 2 slots
+
+A k-mer that is not canonical gets the slot of its reverse complement. Reverse holds
+ReverseComplementIndex of all 4^m halves, only 2^k entries.
+"""
+def CanonicalCount(k):
+    if k % 2:
+        return 4**k // 2
+    return (4**k + 2**k) // 2
+
+def CanonicalSlot(index, k, Reverse):
+    m = k // 2
+    u = Reverse[index & ((1 << 2*m) - 1)]
+    if k % 2 == 0:
+        L = index >> 2*m
+        if L > u:
+            L, u = u, L
+        return u * (u + 1) // 2 + L
+    L = index >> (2*m + 2)
+    M = (index >> 2*m) & 3
+    if L > u or (L == u and M > 1):
+        L, u, M = u, L, 3 - M
+    return 2 * u * u + 4 * L + M
+
+# output: the canonical index stored at Slot, the inverse of CanonicalSlot
+def CanonicalSlotIndex(Slot, k, Reverse):
+    m = k // 2
+    if k % 2 == 0:
+        u = (math.isqrt(8 * Slot + 1) - 1) // 2
+        L = Slot - u * (u + 1) // 2
+        return (L << 2*m) | Reverse[u]
+    u = math.isqrt(Slot // 2)
+    L, M = divmod(Slot - 2 * u * u, 4)
+    return (L << (2*m + 2)) | (M << 2*m) | Reverse[u]
+
+class DenseFrequencies:
+    """
+    input:  k- length of the k-mers
+            Canonical- True if the indices counted are canonical indices, which then
+                       get CanonicalCount(k) counts instead of 4^k
+    """
+    def __init__(self, k, Canonical=False):
+        self.k = k
+        self.Canonical = Canonical
+        if Canonical:
+            self._reverse = [ReverseComplementIndex(half, k // 2) for half in range(4**(k // 2))]
+            self.counts = array('I', [0]) * CanonicalCount(k)
+        else:
+            self.counts = array('I', [0]) * 4**k
+
+    def __getitem__(self, index):
+        if self.Canonical:
+            index = CanonicalSlot(index, self.k, self._reverse)
+        return self.counts[index]
+
+    """
+    Add amount (which may be negative) to the count of index.
+    output: the new count of index
+    """
+    def Add(self, index, amount=1):
+        if self.Canonical:
+            index = CanonicalSlot(index, self.k, self._reverse)
+        counts = self.counts
+        counts[index] += amount
+        return counts[index]
+
+    """
+    output: (index, count) for every index with a nonzero count, in increasing order
+    """
+    def Items(self):
+        if self.Canonical:
+            pairs = [(CanonicalSlotIndex(slot, self.k, self._reverse), count)
+                     for slot, count in enumerate(self.counts) if count]
+            pairs.sort()
+            return iter(pairs)
+        return ((index, count) for index, count in enumerate(self.counts) if count)
+
+    def Serialize(self):
+        return SerializeFrequencies(self)
+
+class SparseFrequencies:
+    """
+    input:  k- length of the k-mers (k <= 32 so that an index fits in 64 bits)
+            Canonical- True if the indices counted are canonical indices
+            Size- expected number of distinct k-mers, to size the table up front
+    """
+    def __init__(self, k, Canonical=False, Size=0):
+        if k > 32:
+            raise ValueError("k must be at most 32 to fit in a uint64")
+        self.k = k
+        self.Canonical = Canonical
+        self.used = 0
+        bits = 4
+        while (1 << bits) < 2 * Size and bits < 2 * k + 1:
+            bits += 1
+        self._Allocate(bits)
+
+    def _Allocate(self, bits):
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self.keys = array('Q', [0]) * (1 << bits)
+        self.counts = array('I', [0]) * (1 << bits)
+        # keys can be 0, so a separate byte marks the slots in use
+        self.filled = bytearray(1 << bits)
+
+    """
+    Multiplying by an odd 64 bit constant (2^64 divided by the golden ratio) and
+    keeping the top bits spreads neighbouring indices, which share their low
+    letters, over the whole table.
+    """
+    def _Slot(self, index):
+        mask = self._mask
+        slot = ((index * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+        keys = self.keys
+        filled = self.filled
+        while filled[slot] and keys[slot] != index:
+            slot = (slot + 1) & mask
+        return slot
+
+    def __getitem__(self, index):
+        slot = self._Slot(index)
+        return self.counts[slot] if self.filled[slot] else 0
+
+    """
+    Add amount (which may be negative) to the count of index. A count that drops to
+    0 keeps its slot, so no other k-mer is ever moved and probing stays simple.
+    output: the new count of index
+    """
+    def Add(self, index, amount=1):
+        # _Slot written out, as this runs once per k-mer
+        keys = self.keys
+        filled = self.filled
+        mask = self._mask
+        slot = ((index * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+        while filled[slot]:
+            if keys[slot] == index:
+                counts = self.counts
+                counts[slot] += amount
+                return counts[slot]
+            slot = (slot + 1) & mask
+        if 2 * (self.used + 1) > len(filled):
+            self._Grow()
+            slot = self._Slot(index)
+        self.filled[slot] = 1
+        self.keys[slot] = index
+        self.counts[slot] = amount
+        self.used += 1
+        return amount
+
+    def _Grow(self):
+        keys, counts, filled = self.keys, self.counts, self.filled
+        self._Allocate(self._bits + 1)
+        for slot in range(len(filled)):
+            if filled[slot]:
+                new = self._Slot(keys[slot])
+                self.filled[new] = 1
+                self.keys[new] = keys[slot]
+                self.counts[new] = counts[slot]
+
+    """
+    output: (index, count) for every index with a nonzero count, in increasing order
+    """
+    def Items(self):
+        pairs = [(self.keys[slot], self.counts[slot]) for slot in range(len(self.filled))
+                 if self.filled[slot] and self.counts[slot]]
+        pairs.sort()
+        return iter(pairs)
+
+    def Serialize(self):
+        return SerializeFrequencies(self)
+
+"""
+input:  k- length of the k-mers
+        Size- number of k-mers that will be counted, or None if unknown
+        Canonical- True if the indices counted are canonical indices
+output: "dense" or "sparse", the table Frequencies picks for them
+"""
+def FrequencyBackend(k, Size=None, Canonical=False):
+    entries = CanonicalCount(k) if Canonical else 4**k
+    if entries <= DenseMinimum or (Size is not None and entries <= min(DenseLimit, 8 * Size)):
+        return "dense"
+    return "sparse"
+
+"""
+input:  k- length of the k-mers
+        Size- number of k-mers that will be counted, or None if unknown
+        Backend- "dense", "sparse", or None to pick one from k and Size
+        Canonical- True if the indices counted are canonical indices
+output: an empty DenseFrequencies or SparseFrequencies
+"""
+def Frequencies(k, Size=None, Backend=None, Canonical=False):
+    if Backend is None:
+        Backend = FrequencyBackend(k, Size, Canonical)
+    if Backend == "dense":
+        return DenseFrequencies(k, Canonical)
+    if Backend == "sparse":
+        return SparseFrequencies(k, Canonical, min(Size or 0, CanonicalCount(k) if Canonical else 4**k))
+    raise ValueError("Backend must be 'dense' or 'sparse', not " + repr(Backend))
+
+"""
+The old text format of ComputingFrequencies: the count of every index from 0 to
+4^k - 1 separated by spaces, or of every canonical index only (in increasing order)
+when the table counts canonical indices.
+"""
+def SerializeFrequencies(Table):
+    k = Table.k
+    if isinstance(Table, DenseFrequencies) and not Table.Canonical:
+        return ' '.join(map(str, Table.counts))
+    counts = dict(Table.Items())
+    indices = range(0, 4**k)
+    if Table.Canonical:
+        indices = (index for index in indices if index <= ReverseComplementIndex(index, k))
+    return ' '.join(str(counts.get(index, 0)) for index in indices)
+
 """
 Code Challenge: Implement ComputingFrequencies to generate a frequency array.
     Input: A DNA string Text followed by an integer k.
     Output: FrequencyArray(Text).
+
+The counts come back as a DenseFrequencies or SparseFrequencies table (see
+Frequencies; Backend forces one of them), and Serialize() writes them out as the
+space separated frequency array text.
+    ex: ComputingFrequencies("AGTC", 2).Serialize()
+        '0 0 1 0 0 0 0 0 0 0 0 1 0 1 0 0'
+
+k-mers that overlap a letter other than A, C, G and T are left out.
+    ex: ComputingFrequencies("AGNNTC", 2).Serialize()
+        '0 0 1 0 0 0 0 0 0 0 0 0 0 1 0 0'
+
+With Canonical=True every k-mer is counted under its canonical index (see
+RollingCanonicalIndex), and the text only has an entry for each canonical index,
+in increasing order: (4^k + 4^(k/2)) / 2 entries instead of 4^k (palindromes, which
+only exist for even k, are their own reverse complement).
+    ex: ComputingFrequencies("AGTC", 2, Canonical=True).Serialize()
+        '0 1 1 0 0 0 0 1 0 0'   (AA AC AG AT CA CC CG GA GC TA)
 """
-def ComputingFrequencies(Text, k):
-    frequency = []
-    for i in range(0, 4**k):
-        frequency.append(0)
-    for i in range(0, (len(Text) - (k-1))):
-        currentPattern = Text[i:i+k]
-        index = PatternToIndex(currentPattern)
-        frequency[index] += 1
-    result = ' '.join(str(number) for number in frequency)
-    return result
+def ComputingFrequencies(Text, k, Canonical=False, Backend=None):
+    # Text may be a stream of letters with no length
+    Size = max(len(Text) - k + 1, 0) if hasattr(Text, '__len__') else None
+    frequency = Frequencies(k, Size, Backend, Canonical)
+    # roll the index along Text instead of calling PatternToIndex on every k-mer
+    Add = frequency.Add
+    for index in (RollingCanonicalIndex if Canonical else RollingPatternToIndex)(Text, k):
+        Add(index)
+    return frequency
 
 #input_file = open("input.txt")
 #Text = input_file.read()
 #k = 5
-#print(ComputingFrequencies('ATGGCGCCTGAATCTCACATATTAGGGTAGATGTCTGCTAGAAGCGAAATTGCATAGGGGGGTCACCCATGCTGCTGCTGTACCTCTGCTGTATACTTTGGCACGGCCCGGCACTATGACTGTACTGGCGCTAACCACGTTCAATCGCGAACCCTACTCTCGACGGTTTTCTGCATCGAATCGTGACGCTCTCCCGTGTATTGCGTTGGTTTTATCAGAGTAATAACTAGTCTAGTAATATCGTGAGCTTTCCTAGCAACTCTAGTCCTCAGCTTCCAAACTGTTTAGAACGCGATTACTCGAGCACAGCGTAATTAGGATCTGGTTAGCCAAAGATTAGCTTAAACATATTGTGCCCCTTTACTACAGGCCCATCCGTGTGACGACGTGTATGGCAATCTCTGCAGGGATTACAACCGCGCTACCTCAGACCTTGCGTGATTGTGAGTCGTCGTGAATTTCTCGTCGATGGCTCACTTCCTAGACGACCGATCTGATGGGTCGACAGATCAACAGATCAGATTGTAGAAATGGCGAGAATAACCCTGCCTGGCGGCTTCGAGTGCACTGGTTGGTCGATGAGTAATCGGCTTACACGCTGCCGCCCGAGGTCCGTAGTCTCATTAGTGCGCACTTCCCGGAGTCACAACTTTCACCTGGATATCCCTAGTTGCCACTCCCTGGTGCGGTCTGCCAAATGCCGCCTACATAATCTCTTGT', 5))
+#print(ComputingFrequencies('ATGGCGCCTGAATCTCACATATTAGGGTAGATGTCTGCTAGAAGCGAAATTGCATAGGGGGGTCACCCATGCTGCTGCTGTACCTCTGCTGTATACTTTGGCACGGCCCGGCACTATGACTGTACTGGCGCTAACCACGTTCAATCGCGAACCCTACTCTCGACGGTTTTCTGCATCGAATCGTGACGCTCTCCCGTGTATTGCGTTGGTTTTATCAGAGTAATAACTAGTCTAGTAATATCGTGAGCTTTCCTAGCAACTCTAGTCCTCAGCTTCCAAACTGTTTAGAACGCGATTACTCGAGCACAGCGTAATTAGGATCTGGTTAGCCAAAGATTAGCTTAAACATATTGTGCCCCTTTACTACAGGCCCATCCGTGTGACGACGTGTATGGCAATCTCTGCAGGGATTACAACCGCGCTACCTCAGACCTTGCGTGATTGTGAGTCGTCGTGAATTTCTCGTCGATGGCTCACTTCCTAGACGACCGATCTGATGGGTCGACAGATCAACAGATCAGATTGTAGAAATGGCGAGAATAACCCTGCCTGGCGGCTTCGAGTGCACTGGTTGGTCGATGAGTAATCGGCTTACACGCTGCCGCCCGAGGTCCGTAGTCTCATTAGTGCGCACTTCCCGGAGTCACAACTTTCACCTGGATATCCCTAGTTGCCACTCCCTGGTGCGGTCTGCCAAATGCCGCCTACATAATCTCTTGT', 5).Serialize())
 
 """
 Pseudocode to find clumps of k-mers w/in the entire genome
@@ -150,3 +606,120 @@ def ClumpFinding(Genome, k, t, L):
             add Pattern to the set FrequentPatterns
     return FrequentPatterns
 """
+
+"""
+Instead of recounting every window of length L from scratch, we keep a single
+frequency array for the current window. Sliding the window one position to the
+right only changes two entries: the k-mer that falls off the front of the window
+loses one occurrence, and the k-mer that enters at the end gains one.
+
+Since a count can only go up when a k-mer enters the window, that entering k-mer
+is the only one we need to check against t at each step.
+
+The counts are kept in a DenseFrequencies or SparseFrequencies table picked by
+Frequencies from k and the length of Genome, so large k no longer needs 4^k counts.
+
+The indices of the k-mer leaving and the k-mer entering the window come from two
+RollingWindowIndex generators running L-k+1 positions apart, so each step is
+O(1) and no per-position index array has to be kept in memory. A k-mer that
+overlaps a letter other than A, C, G and T (such as an N run) has no index and is
+never counted.
+
+The scan itself is serial, but a window only depends on its own L letters. With
+Workers other than 1 (None for every core), Genome is split into segments whose
+windows start in consecutive ranges, each extended by the L - 1 letters that
+follow it, so every window lies whole in exactly one segment. The segments are
+scanned by a pool of processes reading Genome from shared memory (see
+BatchClumpPositions in BatchAnalysis.py), and the earliest window found for each
+k-mer is kept, which gives exactly the serial result. There are a few segments per
+worker so that the pool stays busy, but never fewer than ParallelMinimum windows
+in a segment, so the overlap and the start of each scan stay negligible. Every
+segment uses the table the whole Genome would get, rather than one sized for
+the segment.
+
+input:  Genome- the full base sequence string, or a PackedGenome
+        k- length of the k-mers we are looking for
+        t- minimum number of times a k-mer must appear in a window
+        L- length of the window
+        Workers- number of processes to scan with
+        Backend- "dense" or "sparse" table for the counts (see Frequencies), or
+        None to pick one from k and the length of Genome
+output: dictionary mapping each clump-forming k-mer (in lexicographic order) to
+        the starting position of the first window of length L in which it
+        appears at least t times
+        ex: ClumpPositions("CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGAAGAGAAGAGGAAACATTGTAA", 5, 4, 50)
+            {'CGACA': 0, 'GAAGA': 12}
+"""
+def ClumpPositions(Genome, k, t, L, Workers=1, Backend=None):
+    n = len(Genome)
+    first_seen = {}
+    if n < L or L < k:
+        return first_seen
+    if Backend is None:
+        Backend = FrequencyBackend(k, n - k + 1)
+    if Workers != 1:
+        import os
+        if Workers is None:
+            Workers = os.cpu_count() or 1
+        windows = n - L + 1
+        SegmentSize = max(ParallelMinimum, -(-windows // (4 * Workers)))
+        if Workers > 1 and windows > SegmentSize:
+            from BatchAnalysis import BatchClumpPositions
+            for name, positions in BatchClumpPositions([Genome], k, t, L, Workers, SegmentSize, Backend):
+                return positions
+    frequency = Frequencies(k, n - k + 1, Backend)
+    Add = frequency.Add
+    # leaving yields the k-mer that drops off the front of the window,
+    # entering the k-mer that is added at the end
+    leaving = RollingWindowIndex(Genome, k)
+    entering = RollingWindowIndex(Genome, k)
+    # the first window covers the k-mers starting at 0 to L-k
+    window = [index for index in itertools.islice(entering, L-k+1) if index is not None]
+    for index in window:
+        Add(index)
+    for index in window:
+        if frequency[index] >= t and index not in first_seen:
+            first_seen[index] = 0
+    # slide the window one position at a time, None being a k-mer that is not counted
+    if isinstance(frequency, DenseFrequencies):
+        # index the typed array directly, skipping a method call per k-mer
+        counts = frequency.counts
+        for i, index in enumerate(entering, 1):
+            old = next(leaving)
+            if old is not None:
+                counts[old] -= 1
+            if index is None:
+                continue
+            counts[index] += 1
+            if counts[index] >= t and index not in first_seen:
+                first_seen[index] = i
+    else:
+        for i, index in enumerate(entering, 1):
+            old = next(leaving)
+            if old is not None:
+                Add(old, -1)
+            if index is not None and Add(index) >= t and index not in first_seen:
+                first_seen[index] = i
+    clumps = {}
+    for index in sorted(first_seen):
+        clumps[IndexToPattern(index, k)] = first_seen[index]
+    return clumps
+
+# fewest windows of length L that a segment of a parallel ClumpPositions scans
+ParallelMinimum = 1 << 16
+
+"""
+input:  Genome- the full base sequence string, integers k, t and L, and the number
+        of Workers processes (see ClumpPositions)
+output: list of all k-mers forming (L, t)-clumps in Genome, in lexicographic order
+        ex: ClumpFinding("CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGAAGAGAAGAGGAAACATTGTAA", 5, 4, 50)
+            ['CGACA', 'GAAGA']
+        k-mers overlapping an N run are not counted, in a string or a PackedGenome:
+        ex: ClumpFinding(PackedGenome("CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACNNNNNNNNNNCGACAGAGTGAAGAGAAGAGGAAACATTGTAA"), 5, 4, 50)
+            ['GAAGA']
+"""
+def ClumpFinding(Genome, k, t, L, Workers=1):
+    return list(ClumpPositions(Genome, k, t, L, Workers))
+
+# Genome = "CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGAAGAGAAGAGGAAACATTGTAA"
+# print(ClumpFinding(Genome, 5, 4, 50))
@@ -0,0 +1,144 @@
+from array import array
+"""
+PatternCount and PatternMatching rescan the whole genome for every query, which is
+fine for one pattern but wasteful when thousands of DnaA box candidates (and their
+reverse complements) are looked up in the same genome.
+
+A suffix array lists the starting positions of all suffixes of Genome in
+lexicographic order:
+
+    Genome = "BANANA$"
+    suffixes sorted:  $  A$  ANA$  ANANA$  BANANA$  NA$  NANA$
+    suffix array:     6  5   3     1       0        4    2
+
+Every occurrence of a pattern is the start of a suffix beginning with that pattern,
+and those suffixes sit next to each other in the suffix array. Two binary searches
+find the first and last of them, so a count costs O(|Pattern| · log |Genome|) and
+locating the hits adds only the number of hits, however long the genome is.
+
+The suffix array is built by prefix doubling: suffixes are first ranked by their
+first 16 letters, then by their first 32, 64, ... letters, where ranking by 2h letters
+only needs the pair of ranks (by h letters) of positions i and i+h. It stops as soon
+as every suffix has a different rank.
+"""
+
+"""
+input:  Genome- DNA string
+output: array of suffix start positions in lexicographic order of the suffixes
+        ex: SuffixArray("BANANA")
+            array('l', [5, 3, 1, 0, 4, 2])
+"""
+def SuffixArray(Genome):
+    n = len(Genome)
+    # rank by the first h letters directly, which saves the first few doubling rounds
+    h = 16
+    prefixes = [Genome[i:i+h] for i in range(n)]
+    order = sorted(range(n), key=prefixes.__getitem__)
+    rank = [0] * n
+    for i in range(1, n):
+        rank[order[i]] = rank[order[i-1]] + (prefixes[order[i]] != prefixes[order[i-1]])
+    del prefixes
+    while n and rank[order[-1]] < n - 1:
+        # sort by (rank of the first h letters, rank of the next h letters); a suffix
+        # with nothing after its first h letters sorts first (0)
+        key = [rank[i] * (n + 1) + (rank[i + h] + 1 if i + h < n else 0) for i in range(n)]
+        order.sort(key=key.__getitem__)
+        new_rank = [0] * n
+        for i in range(1, n):
+            new_rank[order[i]] = new_rank[order[i-1]] + (key[order[i]] != key[order[i-1]])
+        rank = new_rank
+        h *= 2
+    return array('l', order)
+
+
+class GenomeIndex:
+    """
+    Build-once index over a genome answering exact count and locate queries.
+
+    input:  Genome- DNA string (a PackedGenome is decoded once)
+            ex: GenomeIndex("GATATATGCATATACTT")
+    """
+    def __init__(self, Genome, Suffixes=None):
+        self.Genome = str(Genome)
+        self.Suffixes = SuffixArray(self.Genome) if Suffixes is None else Suffixes
+
+    def __len__(self):
+        return len(self.Genome)
+
+    def __str__(self):
+        return self.Genome
+
+    """
+    Binary search for the range of the suffix array whose suffixes start with
+    Pattern. Only the first len(Pattern) letters of each suffix are compared.
+
+    output: (first, last) such that Suffixes[first:last] are the hits
+    """
+    def Range(self, Pattern):
+        m = len(Pattern)
+        Genome = self.Genome
+        Suffixes = self.Suffixes
+        lo, hi = 0, len(Suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if Genome[Suffixes[mid]:Suffixes[mid] + m] < Pattern:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = lo
+        hi = len(Suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if Genome[Suffixes[mid]:Suffixes[mid] + m] == Pattern:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, lo
+
+    """
+    output: number of (possibly overlapping) occurrences of Pattern
+        ex: GenomeIndex("GATATATGCATATACTT").Count("ATAT")
+            3
+    """
+    def Count(self, Pattern):
+        if not Pattern:
+            return len(self.Genome) + 1
+        first, last = self.Range(Pattern)
+        return last - first
+
+    """
+    output: sorted list of all starting positions of Pattern
+        ex: GenomeIndex("GATATATGCATATACTT").Locate("ATAT")
+            [1, 3, 9]
+    """
+    def Locate(self, Pattern):
+        if not Pattern:
+            return list(range(len(self.Genome) + 1))
+        first, last = self.Range(Pattern)
+        return sorted(self.Suffixes[first:last])
+
+    """
+    Save the index to disk so it only has to be built once per genome. The file
+    holds the genome length, the genome itself and the suffix array as raw 64 bit
+    integers.
+    """
+    def Save(self, Path):
+        with open(Path, 'wb') as handle:
+            handle.write(b'GENOMEINDEX1\n')
+            handle.write(b'%d\n' % len(self.Genome))
+            handle.write(self.Genome.encode('latin-1'))
+            array('q', self.Suffixes).tofile(handle)
+
+    @classmethod
+    def Load(cls, Path):
+        with open(Path, 'rb') as handle:
+            if handle.readline() != b'GENOMEINDEX1\n':
+                raise ValueError(Path + " is not a saved GenomeIndex")
+            n = int(handle.readline())
+            Genome = handle.read(n).decode('latin-1')
+            Suffixes = array('q')
+            Suffixes.fromfile(handle, n)
+        return cls(Genome, Suffixes)
+
+# Index = GenomeIndex("GATATATGCATATACTT")
+# print(Index.Count("ATAT"), Index.Locate("ATAT"))
@@ -1,4 +1,4 @@
-import itertools
+import MotifCore
 """
 For a given choice of Motifs, we can construct a 4 x k (k-mer length) count matrix,
 called Count(Motifs), counting the number of occurrences of each nucleotide in each
@@ -8,29 +8,8 @@ element (i,j) of Count(Motifs) stores the number of times that nucleotide i (A G
 appears in column j of Motifs
 """
 def Count(Motifs):
-    # initializing the count dictionary
-    count = {}
-    # all motifs will have the same string length
-    k = len(Motifs[0])
-    # for each letter
-    for symbol in "ACGT":
-        # each key in the dictionary ("A", "C", "G", "T") will store a list
-        count[symbol] = []
-        # loop through each letter within the motif string
-        for j in range(k):
-            # create a placeholder for count
-            count[symbol].append(0)
-    # number of motifs in input matrix
-    t = len(Motifs)
-    # for each motif
-    for i in range(t):
-        # for each letter in motif
-        for j in range(k):
-            # save the current letter into a variable
-            symbol = Motifs[i][j]
-            # add to total in count dictionary[current letter][char in motif]
-            count[symbol][j] += 1
-    return count
+    # one count list per letter, see Count in MotifCore.py
+    return MotifCore.Count(Motifs)
 
 # motif1 = "AACGTA"
 # motif2 = "CCCGTT"
@@ -47,15 +26,8 @@ in count we determined the count of each letter within a column
 now we divide the count by the number of motifs that were initially inputted
 """
 def Profile(Motifs):
-    t = len(Motifs)
-    k = len(Motifs[0])
-    profile = {}
-    count = Count(Motifs)
-    for key, motif_lists in sorted(count.items()):
-        profile[key] = motif_lists
-        for motif_list, number in enumerate(motif_lists):
-            motif_lists[motif_list] = number/t
-    return profile
+    # counts divided by the number of motifs t, see Profile in MotifCore.py
+    return MotifCore.Profile(Motifs)
 
 # motif1 = "AACGTA"
 # motif2 = "CCCGTT"
@@ -66,6 +38,14 @@ def Profile(Motifs):
 
 #print(Profile(motifs))
 
+"""
+Count and Profile hand back a dictionary of lists. Underneath, ProfileMatrix in
+MotifCore.py keeps the count matrix as a 4 x k NumPy array built in one vectorized
+pass (plain Python lists when NumPy is not installed), with O(k) Add/Remove of a
+single motif; ProfileMatrix(Motifs).Profile() gives back the same dictionary as
+Profile(Motifs).
+"""
+
 """
 The letter that occurs most often in the matrix column will be deemed the consensus letter
 The consensus letter for each column will form the consensus string
@@ -74,32 +54,21 @@ The consensus letter for each column will form the consensus string
 # Input:  A set of kmers Motifs
 # Output: A consensus string of Motifs.
 def Consensus(Motifs):
-    k = len(Motifs[0])
-    profile = Profile(Motifs)
-    consensus = ""
-    for j in range(k):
-        maximum = 0
-        frequentSymbol = ""
-        for symbol in "ACGT":
-            if profile[symbol][j] > maximum:
-                maximum = profile[symbol][j]
-                frequentSymbol = symbol
-        consensus += frequentSymbol
-    return consensus
+    # the counts are kept per column by MotifSet, see MotifCore.py
+    return MotifCore.Consensus(Motifs)
 
 # profile = {'A': [0.4, 0.3, 0.0, 0.1, 0.0, 0.9],
 #            'C': [0.2, 0.3, 0.0, 0.4, 0.0, 0.1],
 #            'G': [0.1, 0.3, 1.0, 0.1, 0.5, 0.0],
 #            'T': [0.3, 0.1, 0.0, 0.4, 0.5, 0.0]}
-
-
-profile = {'A': [0.2, 0.2, 0.0, 0.0, 0.0, 0.0, 0.9, 0.1, 0.1, 0.1, 0.3, 0.0],
-           'T': [0.1, 0.6, 0.0, 0.0, 0.0, 0.0, 0.0, 0.4, 0.1, 0.2, 0.4, 0.6],
-           'G': [0.0, 0.0, 1.0, 1.0, 0.9, 0.9, 0.1, 0.0, 0.0, 0.0, 0.0, 0.0],
-           'C': [0.7, 0.2, 0.0, 0.0, 0.1, 0.1, 0.0, 0.5, 0.8, 0.7, 0.3, 0.4]}
-text = "ACGGGGATTACC"
-
-print(Consensus(motifs))
+#
+# profile = {'A': [0.2, 0.2, 0.0, 0.0, 0.0, 0.0, 0.9, 0.1, 0.1, 0.1, 0.3, 0.0],
+#            'T': [0.1, 0.6, 0.0, 0.0, 0.0, 0.0, 0.0, 0.4, 0.1, 0.2, 0.4, 0.6],
+#            'G': [0.0, 0.0, 1.0, 1.0, 0.9, 0.9, 0.1, 0.0, 0.0, 0.0, 0.0, 0.0],
+#            'C': [0.7, 0.2, 0.0, 0.0, 0.1, 0.1, 0.0, 0.5, 0.8, 0.7, 0.3, 0.4]}
+# text = "ACGGGGATTACC"
+#
+# print(Consensus(motifs))
 
 """
 Loop through each letter in each motif, and if the letter does not match the
@@ -108,13 +77,8 @@ consensus string, add to score count
 # Input:  A set of k-mers Motifs
 # Output: The score of these k-mers.
 def Score(Motifs):
-    count = 0
-    consensus = Consensus(Motifs)
-    for motif in Motifs:
-        for index, letter in enumerate(motif):
-            if letter != consensus[index]:
-                count += 1
-    return count
+    # t · k minus the largest count of every column, see MotifSet in MotifCore.py
+    return MotifCore.Score(Motifs)
 
 # motif1 = "AACGTA"
 # motif2 = "CCCGTT"
@@ -132,13 +96,8 @@ the product of individual nucleotide probabilities.
 # Input:  String Text and profile matrix Profile
 # Output: Probability value
 def Pr(Text, Profile):
-    p = 1
-    # loop through each index(char) in text
-    for index,char in enumerate(Text):
-        for key, profile_lists in sorted(Profile.items()):
-            if char == key:
-                p *= profile_lists[index]
-    return p
+    # multiply the probability of each letter at its index, see Pr in MotifCore.py
+    return MotifCore.Pr(Text, Profile)
 
 # profile = {'A': [0.4, 0.3, 0.0, 0.1, 0.0, 0.9],
 #            'C': [0.2, 0.3, 0.0, 0.4, 0.0, 0.1],
@@ -156,21 +115,8 @@ great probability.
 # Input:  String Text, an integer k, and profile matrix Profile
 # Output: String of most probable pattern
 def ProfileMostProbablePattern(Text, k, Profile):
-    n = len(Text)
-    maximum = -1
-    probable_pattern = ''
-    for i, letter in enumerate(Text):
-        for i in range(n-k+1):
-            pattern = Text[i:i+k]
-            probability = Pr(pattern,Profile)
-            if (probability > maximum):
-                maximum = probability
-                probable_pattern = pattern
-    if maximum == -1:
-        return Text[0:0+k]
-    else:
-        return probable_pattern
-
+    # scores every k-mer at once in log space, the first most probable k-mer wins
+    return MotifCore.ProfileMostProbablePattern(Text, k, Profile)
 # k = 12
 # profile = {'A': [0.253, 0.217, 0.289, 0.277, 0.217, 0.241, 0.265, 0.253, 0.277, 0.229, 0.265, 0.193],
 #            'C': [0.181, 0.313, 0.325, 0.253, 0.229, 0.253, 0.253, 0.277, 0.157, 0.289, 0.169, 0.265],
@@ -192,26 +138,13 @@ GreedyMotifSearch will return the motifs with the highest scores.
 """
 # Input:  A list of kmers Dna, and integers k and t (where t is the number of kmers in Dna)
 # Output: GreedyMotifSearch(Dna, k, t)
-def GreedyMotifSearch(Dna, k, t):
-    BestMotifs = []
-    # search through DNA string
-    for i in range(0, t):
-        # starts by setting BestMotifs equal to the first k-mer from each string in Dna
-        BestMotifs.append(Dna[i][0:k])
-    n = len(Dna[0])
-    # ranges over all possible k-mers in Dna[0], trying each one as Motifs[0]
-    for i in range(n-k+1):
-        Motifs = []
-        Motifs.append(Dna[0][i:i+k])
-        for j in range(1, t):
-            # builds a profile matrix Profile for this lone k-mer, and sets Motifs[1] equal to the Profile-most probable k-mer in Dna[1]
-            P = Profile(Motifs[0:j])
-            # sets Motifs[i] equal to the Profile-most probable k-mer from Dna[i] based on this profile matrix
-            Motifs.append(ProfileMostProbablePattern(Dna[j], k, P))
-        # GreedyMotifSearch checks whether Motifs outscores the current best scoring collection of motifs, BestMotifs
-        if Score(Motifs) < Score(BestMotifs):
-            BestMotifs = Motifs
-    return BestMotifs
+def GreedyMotifSearch(Dna, k, t, Workers=1):
+    # BestMotifs starts as the first k-mer of each string in Dna. Every k-mer of Dna[0]
+    # is tried as Motifs[0], and Motifs[j] is the profile-most probable k-mer of Dna[j]
+    # for the profile of Motifs[0:j]; the lowest scoring Motifs win, the earliest start
+    # on a tie. The starts can be split over Workers processes, see GreedySearch in
+    # MotifCore.py.
+    return MotifCore.GreedySearch(Dna, k, t, 0, Workers)
 #
 # k = 12
 # t = 25
@@ -229,29 +162,14 @@ Implanted Motif Problem: Find all (k, d)-motifs in a collection of strings.
      Output: All (k, d)-motifs in Dna.
 """
 def HammingDistance(p, q):
-    count = 0
-    n = len(p)
-    for i in range(0, n):
-        if p[i] != q[i]:
-            count += 1
-    return count
+    # shared with Replication.py, see MotifCore.py
+    return MotifCore.HammingDistance(p, q)
 
 def MotifEnumeration(Dna, k, d):
-    patterns = []
-    for kmer in itertools.product('ATCG', repeat=k):
-        kmer = ''.join(kmer)
-        accept = True
-        for seq in Dna:
-            found = False
-            for i in range(len(seq)-k+1):
-                if HammingDistance(kmer,seq[i:i+k]) <= d:
-                    found = True
-                    break
-            if not found:
-                accept = False
-                break
-        if accept:
-            patterns.append(kmer)
+    # only k-mers within d mismatches of some window of every sequence are built,
+    # one letter at a time (see EnumerateMotifs in MotifCore.py), in the order of
+    # itertools.product('ATCG', repeat=k)
+    patterns = list(MotifCore.EnumerateMotifs(Dna, k, d))
     print(" ".join(patterns))
     return patterns
 
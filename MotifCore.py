@@ -0,0 +1,769 @@
+import itertools
+import operator
+"""
+NumPy is optional. The functions below that can use it call _NumPy(), and fall back
+to plain Python when it is not installed, so everything still runs without it.
+"""
+def _NumPy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+"""
+The primitives below used to be written out separately in Motif.py,
+Motif_pseudocount.py and Replication.py. They live here once, and the modules call
+these.
+
+Pseudocounts replace the zeros of a count matrix so that one unseen letter does not
+make a whole k-mer impossible. The strategy is given as Pseudocount:
+
+    None or 0       no pseudocounts (Count and Profile in Motif.py)
+    "laplace"       1 for every letter (CountWithPseudocounts and
+                    ProfileWithPseudocounts in Motif_pseudocount.py); a plain 1
+                    means the same
+    a number        the same pseudocount for every letter
+    a dictionary    its own pseudocount for each of A, C, G and T, for example
+                    proportional to the background frequency of the letter
+"""
+
+"""
+input:  Pseudocount- pseudocount strategy
+output: dictionary with the pseudocount of each of A, C, G and T
+        ex: Pseudocounts("laplace")
+            {'A': 1, 'C': 1, 'G': 1, 'T': 1}
+"""
+def Pseudocounts(Pseudocount=None):
+    if Pseudocount is None:
+        Pseudocount = 0
+    if isinstance(Pseudocount, str):
+        if Pseudocount.lower() != "laplace":
+            raise ValueError("unknown pseudocount strategy " + repr(Pseudocount))
+        Pseudocount = 1
+    if isinstance(Pseudocount, dict):
+        return {symbol: Pseudocount.get(symbol, 0) for symbol in "ACGT"}
+    return dict.fromkeys("ACGT", Pseudocount)
+
+"""
+input:  Motifs- list of k-mers, Pseudocount- pseudocount strategy
+output: count matrix as a dictionary of lists, one list of k counts per letter
+        ex: Count(["AACGTA", "CCCGTT", "CACCTT", "GGATTA", "TTCCGG"])
+            {'A': [1, 2, 1, 0, 0, 2], 'C': [2, 1, 4, 2, 0, 0], 'G': [1, 1, 0, 2, 1, 1], 'T': [1, 1, 0, 1, 4, 2]}
+"""
+def Count(Motifs, Pseudocount=None):
+    return MotifSet(Motifs, Pseudocount).Count()
+
+"""
+input:  Motifs- list of k-mers, Pseudocount- pseudocount strategy
+output: profile matrix, (count + pseudocount) / (t + sum of the pseudocounts)
+"""
+def Profile(Motifs, Pseudocount=None):
+    return MotifSet(Motifs, Pseudocount).Profile()
+
+"""
+input:  Motifs- list of k-mers
+output: consensus string, the most common letter of every column (the first of
+        "ACGT" on a tie); pseudocounts add the same to every letter, so they never
+        change it
+"""
+def Consensus(Motifs):
+    return MotifSet(Motifs).Consensus()
+
+"""
+input:  Motifs- list of k-mers
+output: number of letters that differ from the consensus string
+"""
+def Score(Motifs):
+    return MotifSet(Motifs).Score()
+
+"""
+input:  Text- k-mer, Profile- profile matrix
+output: probability that Profile generates Text, the product of the probabilities
+        of its letters, in order (letters missing from the profile are skipped)
+"""
+def Pr(Text, Profile):
+    p = 1
+    for index, char in enumerate(Text):
+        if char in Profile:
+            p *= Profile[char][index]
+    return p
+
+"""
+input:  two strings p and q of equal length
+output: number of positions where they differ
+"""
+def HammingDistance(p, q):
+    return sum(map(operator.ne, p, q))
+
+"""
+Pr(Text, Profile) multiplies one probability per letter, and ProfileMostProbablePattern
+calls it for every k-mer of Text. Here the profile is turned into a matrix of log
+probabilities once, so the probability of a k-mer becomes a sum, and the sums for all
+k-mers of Text are taken at once over a sliding window of the encoded text:
+
+    log Pr(Text[i:i+k]) = LogProfile[Text[i], 0] + LogProfile[Text[i+1], 1] + ...
+
+A probability of 0 becomes -inf. Letters that are not rows of the profile are
+skipped by Pr (they count as probability 1), so they get an extra row of zeros.
+"""
+
+"""
+input:  Profile- profile matrix as a dictionary of lists
+output: (lookup, log_profile) where lookup maps every byte to its row of log_profile
+        and log_profile is a (rows + 1) x k matrix, the last row all zeros
+"""
+def LogProfile(Profile):
+    import numpy as np
+    symbols = list(Profile)
+    k = len(Profile[symbols[0]]) if symbols else 0
+    lookup = np.full(256, len(symbols), dtype=np.intp)
+    log_profile = np.zeros((len(symbols) + 1, k))
+    with np.errstate(divide='ignore'):
+        for row, symbol in enumerate(symbols):
+            if len(symbol) == 1 and ord(symbol) < 256:
+                lookup[ord(symbol)] = row
+            log_profile[row] = np.log(np.asarray(Profile[symbol], dtype=np.float64))
+    return lookup, log_profile
+
+"""
+input:  Text- DNA string, k, and Profile- profile matrix as a dictionary of lists
+output: NumPy array with log Pr(Text[i:i+k], Profile) for every i
+        ex: ProfileLogScores("ACGTT", 2, {'A': [0.5, 0.5], 'C': [0.5, 0.5], 'G': [0.0, 0.0], 'T': [0.0, 0.0]})
+            [-1.386 -inf -inf -inf]
+"""
+def ProfileLogScores(Text, k, Profile):
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+    n = len(Text)
+    if n < k:
+        return np.zeros(0)
+    lookup, log_profile = LogProfile(Profile)
+    codes = lookup[np.frombuffer(Text.encode('latin-1', 'replace'), dtype=np.uint8)]
+    windows = sliding_window_view(codes, k)
+    return log_profile[windows, np.arange(k)].sum(axis=1)
+
+"""
+input:  NumPy array of log probabilities, as from ProfileLogScores
+output: list of weights proportional to the probabilities, the largest one 1 (if
+        every probability is 0, all weights are 1)
+"""
+def LogScoresToWeights(Scores):
+    import numpy as np
+    best = Scores.max() if len(Scores) else 0.0
+    if best == -np.inf:
+        return [1.0] * len(Scores)
+    return np.exp(Scores - best).tolist()
+
+"""
+Vectorized ProfileMostProbablePattern: the first k-mer of Text with the highest
+probability, or the first k-mer if none has a probability above 0.
+
+Sums of logs can round differently from the products computed by Pr, so k-mers whose
+log score comes within a hair of the best are compared again with the exact product,
+and the first of those with the largest product wins, as it does with Pr.
+
+Without NumPy every k-mer is scored with Pr in a single pass instead.
+
+input:  Text- DNA string, k, and Profile- profile matrix as a dictionary of lists
+output: index of the most probable k-mer of Text
+"""
+def MostProbableIndex(Text, k, Profile):
+    np = _NumPy()
+    if np is None:
+        return _FirstMostProbable(Text, k, Profile, range(len(Text) - k + 1))
+    scores = ProfileLogScores(Text, k, Profile)
+    if len(scores) == 0:
+        return 0
+    best = scores.max()
+    if best == -np.inf:
+        return 0
+    candidates = np.flatnonzero(scores >= best - 1e-9 * max(1.0, abs(best)))
+    if len(candidates) == 1:
+        return int(candidates[0])
+    return _FirstMostProbable(Text, k, Profile, candidates.tolist())
+
+# Output: the first of the Starts whose k-mer has the largest Pr (0 if there are none)
+def _FirstMostProbable(Text, k, Profile, Starts):
+    maximum = -1
+    index = 0
+    for i in Starts:
+        probability = Pr(Text[i:i+k], Profile)
+        if probability > maximum:
+            maximum = probability
+            index = i
+    return index
+
+"""
+input:  Text- DNA string, k, and Profile- profile matrix as a dictionary of lists
+output: most probable k-mer of Text (same result as ProfileMostProbablePattern in Motif.py)
+        ex: ProfileMostProbablePattern("ACCTGTTTATTGCCTAAGTTCCGAACAAACCCAATATAGCCCGAGGGCCT", 5,
+                {'A': [0.2, 0.2, 0.3, 0.2, 0.3], 'C': [0.4, 0.3, 0.1, 0.5, 0.1],
+                 'G': [0.3, 0.3, 0.5, 0.2, 0.4], 'T': [0.1, 0.2, 0.1, 0.1, 0.2]})
+            CCGAG
+"""
+def ProfileMostProbablePattern(Text, k, Profile):
+    i = MostProbableIndex(Text, k, Profile)
+    return Text[i:i+k]
+
+"""
+Score(Motifs) rebuilds Consensus, which rebuilds Profile, which rebuilds Count, so
+every score costs O(t · k) and a search loop pays that for every candidate. Since
+the consensus letter of a column is the letter counted most often there, the score
+is just
+
+    Score(Motifs) = t · k - (sum over the columns of the largest count)
+
+A ProfileMatrix keeps the count matrix itself. The motifs are encoded once as a
+t x k matrix of numbers (A = 0, C = 1, G = 2, T = 3, as in PatternToIndex in
+Clump.py) and the count matrix is a 4 x k NumPy array, built with one bincount:
+
+    Motifs   AACGTA          Count   A: 1 2 1 0 0 2
+             CCCGTT                  C: 2 1 4 2 0 0
+             CACCTT    ->            G: 1 1 0 2 1 1
+             GGATTA                  T: 1 1 0 1 4 2
+             TTCCGG
+
+Row i of the count matrix is the nucleotide "ACGT"[i], column j is position j of the
+motifs. Adding or removing one motif changes one cell per column, O(k), and the
+score and consensus are a maximum over the columns. The dictionaries of lists used
+everywhere else are views built from the array by Count() and Profile().
+
+Without NumPy the counts are kept per column in plain dictionaries, together with
+the consensus letter of every column and the sum of the largest counts, so the score
+is still read in O(1) and a motif still changes in O(k).
+
+A MotifSet is the list of motifs with their ProfileMatrix. Count, Profile, Consensus
+and Score above all read their answer from one, and the greedy, randomized and Gibbs
+searches keep one across their iterations instead of rebuilding the count matrix.
+"""
+
+"""
+input:  Motifs- list of k-mers (all the same length), k- their length, only needed
+        when Motifs is empty
+output: t x k NumPy uint8 matrix of base 4 numbers, 4 for any other letter
+        ex: EncodeMotifs(["ACG", "TTA"])
+            [[0 1 2]
+             [3 3 0]]
+"""
+def EncodeMotifs(Motifs, k=None):
+    import numpy as np
+    t = len(Motifs)
+    if k is None:
+        k = len(Motifs[0]) if t else 0
+    if any(len(motif) != k for motif in Motifs):
+        raise ValueError("motifs must all have length " + str(k))
+    return _EncodeLetters(np, ''.join(Motifs)).reshape(t, k)
+
+def _EncodeLetters(np, Text):
+    lookup = np.full(256, 4, dtype=np.uint8)
+    for number, symbol in enumerate(b"ACGT"):
+        lookup[symbol] = number
+    return lookup[np.frombuffer(Text.encode('latin-1', 'replace'), dtype=np.uint8)]
+
+class ProfileMatrix:
+    """
+    input:  Motifs- list of k-mers, or a t x k matrix from EncodeMotifs
+            Pseudocount- pseudocount strategy, see Pseudocounts (0 for Profile,
+                         1 or "laplace" for ProfileWithPseudocounts)
+            k- motif length, only needed when Motifs is empty
+            ex: ProfileMatrix(["AACGTA", "CCCGTT", "CACCTT", "GGATTA", "TTCCGG"], 1).Profile()
+    """
+    def __init__(self, Motifs=(), Pseudocount=0, k=None):
+        self.Pseudocount = Pseudocount
+        self._np = np = _NumPy()
+        if np is None:
+            Motifs = list(Motifs)
+            if k is None:
+                k = len(Motifs[0]) if Motifs else 0
+            self.t = 0
+            self.k = k
+            self._columns = [dict.fromkeys("ACGT", 0) for j in range(k)]
+            self._consensus = ["A"] * k
+            self._maxima = 0
+            for motif in Motifs:
+                self.Add(motif)
+            return
+        if isinstance(Motifs, np.ndarray):
+            encoded = Motifs
+        else:
+            encoded = EncodeMotifs(list(Motifs), k)
+        self.t, self.k = encoded.shape
+        self._positions = np.arange(self.k)
+        # one bincount over (number * k + column) counts every cell in a single pass;
+        # row 4 counts the letters other than A, C, G and T, which no profile uses
+        cells = (encoded.astype(np.intp) * self.k + self._positions).ravel()
+        self.Counts = np.bincount(cells, minlength=5 * self.k).reshape(5, self.k)
+
+    """
+    Add one motif to the counts, or take it away again, in O(k). Motif may be a
+    string or an encoded row.
+    """
+    def Add(self, Motif):
+        self.t += 1
+        if self._np is None:
+            self._Update(Motif, 1)
+        else:
+            self.Counts[self._Row(Motif), self._positions] += 1
+
+    def Remove(self, Motif):
+        self.t -= 1
+        if self._np is None:
+            self._Update(Motif, -1)
+        else:
+            self.Counts[self._Row(Motif), self._positions] -= 1
+
+    def _Row(self, Motif):
+        if isinstance(Motif, str):
+            return _EncodeLetters(self._np, Motif)
+        return Motif
+
+    """
+    Without NumPy: count each letter of Motif (Step = 1) or take it away again
+    (Step = -1), and update the consensus letter of every column it touches.
+    """
+    def _Update(self, Motif, Step):
+        consensus = self._consensus
+        for j, letter in enumerate(Motif):
+            column = self._columns[j]
+            if letter not in column:
+                continue
+            column[letter] += Step
+            best = consensus[j]
+            if Step > 0:
+                if column[letter] > column[best] or (column[letter] == column[best] and letter < best):
+                    consensus[j] = letter
+                    self._maxima += column[letter] - column[best]
+                elif letter == best:
+                    self._maxima += 1
+            elif letter == best:
+                # the old consensus letter lost one, the first largest count now wins
+                new_best = max("ACGT", key=column.__getitem__)
+                consensus[j] = new_best
+                self._maxima += column[new_best] - column[letter] - 1
+
+    """
+    output: number of letters that differ from the consensus, same as Score(Motifs)
+    """
+    def Score(self):
+        if self._np is None:
+            return self.t * self.k - self._maxima
+        return self.t * self.k - int(self.Counts[:4].max(axis=0).sum())
+
+    """
+    output: consensus string, the first of "ACGT" wins a tie as in Consensus(Motifs)
+    """
+    def Consensus(self):
+        if self._np is None:
+            return ''.join(self._consensus)
+        return ''.join("ACGT"[number] for number in self.Counts[:4].argmax(axis=0).tolist())
+
+    """
+    output: count matrix as a dictionary of lists, count + pseudocount, the same as
+            Count (Pseudocount 0) or CountWithPseudocounts (Pseudocount 1)
+    """
+    def Count(self):
+        weights = Pseudocounts(self.Pseudocount)
+        count = {}
+        for i, symbol in enumerate("ACGT"):
+            if self._np is None:
+                count[symbol] = [column[symbol] + weights[symbol] for column in self._columns]
+            else:
+                count[symbol] = (self.Counts[i] + weights[symbol]).tolist()
+        return count
+
+    """
+    output: profile matrix as a dictionary of lists, (count + pseudocount) / (t + sum
+            of the pseudocounts), the same as Profile (Pseudocount 0) or
+            ProfileWithPseudocounts (Pseudocount 1)
+    """
+    def Profile(self):
+        weights = Pseudocounts(self.Pseudocount)
+        total = self.t + sum(weights.values())
+        if not total:
+            raise ZeroDivisionError("no motifs and no pseudocounts to make a profile from")
+        profile = {}
+        for i, symbol in enumerate("ACGT"):
+            weight = weights[symbol]
+            if self._np is None:
+                profile[symbol] = [(column[symbol] + weight) / total for column in self._columns]
+            else:
+                profile[symbol] = ((self.Counts[i] + weight) / total).tolist()
+        return profile
+
+# motifs = ["AACGTA", "CCCGTT", "CACCTT", "GGATTA", "TTCCGG"]
+# print(ProfileMatrix(motifs).Profile())
+
+class MotifSet:
+    """
+    input:  Motifs- list of k-mers
+            Pseudocount- pseudocount strategy used by Profile, see Pseudocounts (0 as
+                         in Motif.py, 1 as in Motif_pseudocount.py); the score never uses it
+            k- motif length, only needed when Motifs is empty
+            ex: MotifSet(["AACGTA", "CCCGTT", "CACCTT", "GGATTA", "TTCCGG"]).Score()
+                14
+    """
+    def __init__(self, Motifs=(), Pseudocount=0, k=None):
+        self.Motifs = list(Motifs)
+        self.Pseudocount = Pseudocount
+        if k is None and self.Motifs:
+            k = len(self.Motifs[0])
+        self.k = k
+        # built with the first motif when neither Motifs nor k gives the length
+        self._matrix = None if k is None else ProfileMatrix(self.Motifs, Pseudocount, k)
+
+    def __len__(self):
+        return len(self.Motifs)
+
+    def __iter__(self):
+        return iter(self.Motifs)
+
+    def __getitem__(self, Index):
+        return self.Motifs[Index]
+
+    """
+    Add Motif to the end of the set.
+    """
+    def Append(self, Motif):
+        if self._matrix is None:
+            self.k = len(Motif)
+            self._matrix = ProfileMatrix((), self.Pseudocount, self.k)
+        self.Motifs.append(Motif)
+        self._matrix.Add(Motif)
+
+    """
+    Swap the motif at position Index for Motif, in O(k).
+    """
+    def Replace(self, Index, Motif):
+        self._matrix.Remove(self.Motifs[Index])
+        self.Motifs[Index] = Motif
+        self._matrix.Add(Motif)
+
+    """
+    output: number of letters that differ from the consensus, same as Score(Motifs)
+    """
+    def Score(self):
+        return self._matrix.Score() if self._matrix is not None else 0
+
+    """
+    output: consensus string, the first of "ACGT" wins a tie as in Consensus(Motifs)
+    """
+    def Consensus(self):
+        return self._matrix.Consensus() if self._matrix is not None else ''
+
+    """
+    output: count matrix as a dictionary of lists, see ProfileMatrix.Count
+    """
+    def Count(self):
+        return self._matrix.Count()
+
+    """
+    output: profile matrix as a dictionary of lists, see ProfileMatrix.Profile, of the
+            motifs leaving out the one at position Excluding if given (as the Gibbs
+            sampler does), in O(k)
+    """
+    def Profile(self, Excluding=None):
+        if Excluding is None:
+            return self._matrix.Profile()
+        self._matrix.Remove(self.Motifs[Excluding])
+        profile = self._matrix.Profile()
+        self._matrix.Add(self.Motifs[Excluding])
+        return profile
+
+"""
+input:  Text- DNA string, k, and Profile- profile matrix as a dictionary of lists
+output: list with a weight for the k-mer starting at every position of Text,
+        proportional to its probability under Profile (if every probability is 0,
+        all weights are 1); all windows are scored at once when NumPy is installed,
+        one Pr per k-mer otherwise
+        ex: ProfileWeights("ACGTT", 2, {'A': [0.5, 0.5], 'C': [0.5, 0.5], 'G': [0.0, 0.0], 'T': [0.0, 0.0]})
+            [1.0, 0.0, 0.0, 0.0]
+"""
+def ProfileWeights(Text, k, Profile):
+    if _NumPy() is not None:
+        return LogScoresToWeights(ProfileLogScores(Text, k, Profile))
+    weights = [Pr(Text[i:i+k], Profile) for i in range(len(Text) - k + 1)]
+    if not any(weights):
+        return [1.0] * len(weights)
+    return weights
+
+"""
+MotifEnumeration tries all 4^k k-mers against every window of every sequence. A
+(k, d)-motif is within d mismatches of some window of every sequence, so the k-mers
+are instead built one letter at a time, keeping for every window of every sequence
+the number of mismatches with the prefix built so far:
+
+    prefix     windows still within d mismatches
+    A          all windows
+    AT         windows whose first two letters differ from AT at most d times
+    ATC        ...
+
+A window that passes d mismatches can never come back, so it is dropped. As soon as
+some sequence has no window left, no k-mer starting with that prefix can be a motif
+and the whole subtree is skipped. This means only k-mers within d mismatches of a
+window of the first sequence (its d-neighborhood) are ever reached.
+
+All prefixes of the same length are extended together with NumPy, as one array of
+(prefix, window, mismatches) triples. When that array grows past EnumerationBatch
+triples the prefixes are split in two and each half is finished before the next, so
+memory stays bounded. Without NumPy the prefixes are extended one at a time instead,
+depth first, each keeping its own lists of (window, mismatches) pairs.
+
+Letters are tried in the order A, T, C, G, so the motifs come out in the same order
+as from itertools.product('ATCG', repeat=k).
+"""
+# most (prefix, window) pairs extended at once by EnumerateMotifs
+EnumerationBatch = 1 << 21
+
+"""
+input:  Dna- list of strings, integers k and d
+output: generator of all (k, d)-motifs in Dna
+        ex: list(EnumerateMotifs(["ATTTGGC", "TGCCTTA", "CGGTATC", "GAAAATT"], 3, 1))
+            ['ATA', 'ATT', 'TTT', 'GTT']
+"""
+def EnumerateMotifs(Dna, k, d):
+    if not Dna:
+        for kmer in itertools.product('ATCG', repeat=k):
+            yield ''.join(kmer)
+        return
+    if any(len(seq) < k for seq in Dna):
+        return
+    np = _NumPy()
+    if np is None:
+        windows = [[(start, 0) for start in range(len(seq) - k + 1)] for seq in Dna]
+        yield from _ExtendPrefix(Dna, k, d, "", windows)
+        return
+    from numpy.lib.stride_tricks import sliding_window_view
+    # letters as numbers in the order they are tried, anything else never matches
+    lookup = np.full(256, 4, dtype=np.int8)
+    for number, symbol in enumerate(b"ATCG"):
+        lookup[symbol] = number
+    windows = []
+    sequences = []
+    for s, seq in enumerate(Dna):
+        codes = lookup[np.frombuffer(seq.encode('latin-1', 'replace'), dtype=np.uint8)]
+        windows.append(sliding_window_view(codes, k))
+        sequences.append(np.full(len(seq) - k + 1, s, dtype=np.int64))
+    # one row per window of every sequence, and the sequence each row came from
+    # column j holds letter j of every window, so one letter of many windows is a
+    # single gather
+    windows = np.ascontiguousarray(np.concatenate(windows).T)
+    sequences = np.concatenate(sequences)
+    rows = np.arange(windows.shape[1], dtype=np.int32)
+    # start from the empty prefix, which every window matches
+    prefixes = np.zeros(1, dtype=np.int64)
+    yield from _ExtendPrefixes(windows, sequences, len(Dna), k, d, 0, prefixes,
+                               np.zeros(len(rows), dtype=np.int64), rows, np.zeros(len(rows), dtype=np.int8))
+
+"""
+Extend the prefixes of length Depth (base 4 numbers, in the order A, T, C, G) to
+length k. Windows[j] holds letter j of every window, and triple i says window
+Rows[i] is Mismatches[i] mismatches from prefix Prefixes[Nodes[i]].
+"""
+def _ExtendPrefixes(Windows, Sequences, t, k, d, Depth, Prefixes, Nodes, Rows, Mismatches):
+    import numpy as np
+    if Depth == k:
+        for number in Prefixes.tolist():
+            letters = []
+            for j in range(k):
+                letters.append("ATCG"[number & 3])
+                number >>= 2
+            yield ''.join(reversed(letters))
+        return
+    if 4 * len(Rows) > EnumerationBatch and len(Prefixes) > 1:
+        half = len(Prefixes) // 2
+        for first, last in ((0, half), (half, len(Prefixes))):
+            keep = (Nodes >= first) & (Nodes < last)
+            yield from _ExtendPrefixes(Windows, Sequences, t, k, d, Depth, Prefixes[first:last],
+                                       Nodes[keep] - first, Rows[keep], Mismatches[keep])
+        return
+    letters = Windows[Depth][Rows]
+    # a window below d mismatches stays alive for all four letters (one more mismatch
+    # for the three that differ), one at d mismatches only for its own letter
+    below = Mismatches < d
+    numbers = np.arange(4, dtype=Nodes.dtype)[:, None]
+    exact = ~below & (letters < 4)
+    Nodes = np.concatenate(((4 * Nodes[below] + numbers).ravel(), 4 * Nodes[exact] + letters[exact]))
+    Rows = np.concatenate((np.tile(Rows[below], 4), Rows[exact]))
+    Mismatches = np.concatenate(((Mismatches[below] + (letters[below] != numbers)).ravel(), Mismatches[exact]))
+    # a child survives if every sequence still has a window within d mismatches of it
+    present = np.zeros(4 * len(Prefixes) * t, dtype=bool)
+    present[Nodes * t + Sequences[Rows]] = True
+    survivors = np.flatnonzero(present.reshape(-1, t).all(axis=1))
+    if len(survivors) == 0:
+        return
+    # number the surviving children 0, 1, 2, ... in order, and drop the other triples
+    renumber = np.full(4 * len(Prefixes), -1, dtype=np.int64)
+    renumber[survivors] = np.arange(len(survivors))
+    Nodes = renumber[Nodes]
+    keep = Nodes >= 0
+    Prefixes = 4 * Prefixes[survivors >> 2] + (survivors & 3)
+    yield from _ExtendPrefixes(Windows, Sequences, t, k, d, Depth + 1, Prefixes,
+                               Nodes[keep], Rows[keep], Mismatches[keep])
+
+"""
+Extend Prefix to length k without NumPy. Windows[s] lists (start, mismatches) for
+every window of Dna[s] still within d mismatches of Prefix.
+"""
+def _ExtendPrefix(Dna, k, d, Prefix, Windows):
+    depth = len(Prefix)
+    if depth == k:
+        yield Prefix
+        return
+    for letter in "ATCG":
+        children = []
+        for seq, windows in zip(Dna, Windows):
+            kept = []
+            for start, mismatches in windows:
+                if seq[start + depth] == letter:
+                    kept.append((start, mismatches))
+                elif mismatches < d:
+                    kept.append((start, mismatches + 1))
+            # no window of this sequence is left, so no motif starts with Prefix + letter
+            if not kept:
+                break
+            children.append(kept)
+        else:
+            yield from _ExtendPrefix(Dna, k, d, Prefix + letter, children)
+
+"""
+GreedyMotifSearch asks for the profile-most probable k-mer of the same t - 1
+sequences again for every one of the n - k + 1 starting k-mers of Dna[0]. A
+SequenceScorer encodes its sequence once, with the table of which cell of the log
+profile every letter of every window reads, and keeps the arrays it scores into, so
+each query is two NumPy calls that allocate nothing new. Without NumPy it scores
+with MostProbableIndex, one Pr per k-mer.
+"""
+class SequenceScorer:
+    """
+    input:  Text- DNA string, k
+            ex: SequenceScorer("ACCTGTTTATTGCCTAAGTTCCGAACAAACCCAATATAGCCCGAGGGCCT", 5)
+    """
+    def __init__(self, Text, k):
+        self.Text = Text
+        self.k = k
+        self._m = max(len(Text) - k + 1, 0)
+        self._np = np = _NumPy()
+        if np is None:
+            return
+        from numpy.lib.stride_tricks import sliding_window_view
+        lookup = np.full(256, 4, dtype=np.intp)
+        for number, symbol in enumerate(b"ACGT"):
+            lookup[symbol] = number
+        codes = lookup[np.frombuffer(Text.encode('latin-1', 'replace'), dtype=np.uint8)]
+        # cell (letter, column) of a 5 x k log profile, flattened; row 4 is all zeros
+        # for letters other than A, C, G and T
+        if self._m:
+            self._cells = sliding_window_view(codes, k) * k + np.arange(k)
+        self._log_profile = np.zeros((5, k))
+        self._gathered = np.empty((self._m, k))
+        self._scores = np.empty(self._m)
+
+    """
+    Same result as MostProbableIndex(Text, k, Profile), for a profile over A, C, G, T.
+    """
+    def MostProbableIndex(self, Profile):
+        np = self._np
+        if np is None:
+            return MostProbableIndex(self.Text, self.k, Profile)
+        if self._m == 0:
+            return 0
+        with np.errstate(divide='ignore'):
+            for row, symbol in enumerate("ACGT"):
+                np.log(Profile[symbol], out=self._log_profile[row])
+        np.take(self._log_profile.ravel(), self._cells, out=self._gathered)
+        scores = self._gathered.sum(axis=1, out=self._scores)
+        best = scores.max()
+        if best == -np.inf:
+            return 0
+        candidates = np.flatnonzero(scores >= best - 1e-9 * max(1.0, abs(best)))
+        if len(candidates) == 1:
+            return int(candidates[0])
+        return _FirstMostProbable(self.Text, self.k, Profile, candidates.tolist())
+
+"""
+GreedyMotifSearch (Pseudocount 0) and GreedyMotifSearchWithPseudocounts
+(Pseudocount 1), with the starting k-mers of Dna[0] optionally split over a pool of
+Workers processes. The sequences are copied once into shared memory, which every
+worker maps when it starts, so only ranges of starting positions are sent to them.
+Each range reports its best start, and the lowest score wins with ties going to the
+earliest start, exactly as when the starts are tried in order. Workers=None uses
+every core. With Workers=1 the search runs here, and its sequences and scorers are
+passed along directly rather than kept in the module, so nothing outlives the call.
+
+input:  Dna- list of strings, integers k and t, Pseudocount, Workers
+output: best motifs, as from GreedyMotifSearch
+"""
+def GreedySearch(Dna, k, t, Pseudocount=0, Workers=1):
+    import os
+    Dna = list(Dna[:t])
+    BestMotifs = [seq[0:k] for seq in Dna]
+    BestScore = MotifSet(BestMotifs).Score()
+    starts = len(Dna[0]) - k + 1
+    if starts <= 0:
+        return BestMotifs
+    if Workers is None:
+        Workers = os.cpu_count() or 1
+    Workers = max(1, min(Workers, starts))
+    if Workers == 1:
+        results = [_GreedyRange(0, starts, _GreedyState(Dna, k, Pseudocount))]
+    else:
+        import concurrent.futures
+        from multiprocessing import shared_memory
+        raw = ''.join(Dna).encode('latin-1', 'replace')
+        memory = shared_memory.SharedMemory(create=True, size=max(len(raw), 1))
+        try:
+            memory.buf[:len(raw)] = raw
+            lengths = [len(seq) for seq in Dna]
+            # a few ranges per worker, so that a slow range does not hold up the others
+            step = max(1, -(-starts // (4 * Workers)))
+            with concurrent.futures.ProcessPoolExecutor(Workers, initializer=_StartGreedyWorker,
+                                                        initargs=(memory.name, lengths, k, Pseudocount)) as pool:
+                results = list(pool.map(_GreedyRange, range(0, starts, step),
+                                        [min(start + step, starts) for start in range(0, starts, step)]))
+        finally:
+            memory.close()
+            memory.unlink()
+    Score, Start, Motifs = min(results, key=lambda result: result[:2])
+    if Score < BestScore:
+        return Motifs
+    return BestMotifs
+
+# sequences, their scorers, k and the pseudocount, set once per pool worker
+_Greedy = None
+
+def _GreedyState(Dna, k, Pseudocount):
+    return Dna, [SequenceScorer(seq, k) for seq in Dna], k, Pseudocount
+
+def _StartGreedyWorker(Name, Lengths, k, Pseudocount):
+    global _Greedy
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(name=Name)
+    raw = bytes(memory.buf[:sum(Lengths)]).decode('latin-1')
+    memory.close()
+    Dna = []
+    start = 0
+    for length in Lengths:
+        Dna.append(raw[start:start+length])
+        start += length
+    _Greedy = _GreedyState(Dna, k, Pseudocount)
+
+# Output: (score, start, motifs) of the best starting k-mer of Dna[0] from Start to Stop - 1
+# State: from _GreedyState, the worker's _Greedy when not given
+def _GreedyRange(Start, Stop, State=None):
+    if State is None:
+        State = _Greedy
+    Dna, scorers, k, pseudocount = State
+    BestScore = float('inf')
+    BestStart = Start
+    BestMotifs = []
+    for i in range(Start, Stop):
+        Motifs = MotifSet([Dna[0][i:i+k]], pseudocount)
+        for j in range(1, len(Dna)):
+            index = scorers[j].MostProbableIndex(Motifs.Profile())
+            Motifs.Append(Dna[j][index:index+k])
+        if Motifs.Score() < BestScore:
+            BestScore = Motifs.Score()
+            BestStart = i
+            BestMotifs = list(Motifs)
+    return BestScore, BestStart, BestMotifs
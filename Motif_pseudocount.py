@@ -1,4 +1,9 @@
+import bisect
+import itertools
+import os
 import random
+import sys
+import MotifCore
 
 """
 The functions in Motif.py will return 0 for an entire motif probability even if only
@@ -13,36 +18,13 @@ with small numbers called pseudocounts.
 # Input:  String Text, an integer k, and profile matrix Profile
 # Output: String of most probable pattern
 def ProfileMostProbablePattern(Text, k, Profile):
-    n = len(Text)
-    maximum = -1
-    probable_pattern = ''
-    for i, letter in enumerate(Text):
-        for i in range(n-k+1):
-            pattern = Text[i:i+k]
-            probability = Pr(pattern,Profile)
-            if (probability > maximum):
-                maximum = probability
-                probable_pattern = pattern
-    if maximum == -1:
-        return Text[0:0+k]
-    else:
-        return probable_pattern
-
+    # scores every k-mer at once in log space, the first most probable k-mer wins
+    return MotifCore.ProfileMostProbablePattern(Text, k, Profile)
 # Input:  A set of kmers Motifs
 # Output: CountWithPseudocounts(Motifs)
 def CountWithPseudocounts(Motifs):
-    t = len(Motifs)
-    k = len(Motifs[0])
-    count = {}
-    for symbol in "ACGT":
-        count[symbol] = []
-        for j in range(k):
-            count[symbol].append(1)
-    for i in range(t):
-        for j in range(k):
-            symbol = Motifs[i][j]
-            count[symbol][j] += 1
-    return count
+    # every count starts at 1 instead of 0 (Laplace), see Count in MotifCore.py
+    return MotifCore.Count(Motifs, "laplace")
 
 """
 ProfileWithPseudocounts(Motifs) that takes a list of strings Motifs as input and
@@ -52,15 +34,8 @@ returns the profile matrix of Motifs with pseudocounts as a dictionary of lists
 # Input:  A set of kmers Motifs
 # Output: ProfileWithPseudocounts(Motifs)
 def ProfileWithPseudocounts(Motifs):
-    t = len(Motifs)
-    k = len(Motifs[0])
-    profile = {}
-    count = CountWithPseudocounts(Motifs)
-    for key, motif_lists in sorted(count.items()):
-        profile[key] = motif_lists
-        for motif_list, number in enumerate(motif_lists):
-            motif_lists[motif_list] = number/(float(t+4))
-    return profile
+    # (count + 1) / (t + 4), see Profile in MotifCore.py
+    return MotifCore.Profile(Motifs, "laplace")
 
 # motif1 = "AACGTA"
 # motif2 = "CCCGTT"
@@ -70,6 +45,9 @@ def ProfileWithPseudocounts(Motifs):
 # motifs = [motif1, motif2, motif3, motif4, motif5]
 #
 # print(ProfileWithPseudocounts(motifs))
+#
+# the same profile backed by a 4 x k NumPy array (see MotifCore.py):
+# print(MotifCore.ProfileMatrix(motifs, 1).Profile())
 
 """
  Write a function GreedyMotifSearchWithPseudocounts(Dna, k, t) that takes a list
@@ -78,64 +56,31 @@ def ProfileWithPseudocounts(Motifs):
  """
 # Input:  A list of kmers Dna, and integers k and t (where t is the number of kmers in Dna)
 # Output: GreedyMotifSearch(Dna, k, t)
-def GreedyMotifSearchWithPseudocounts(Dna, k, t):
-    BestMotifs = []
-    # search through DNA string
-    for i in range(0, t):
-        # starts by setting BestMotifs equal to the first k-mer from each string in Dna
-        BestMotifs.append(Dna[i][0:k])
-    n = len(Dna[0])
-    # ranges over all possible k-mers in Dna[0], trying each one as Motifs[0]
-    for i in range(n-k+1):
-        Motifs = []
-        Motifs.append(Dna[0][i:i+k])
-        for j in range(1, t):
-            # builds a profile matrix Profile for this lone k-mer, and sets Motifs[1] equal to the Profile-most probable k-mer in Dna[1]
-            P = ProfileWithPseudocounts(Motifs[0:j])
-            # sets Motifs[i] equal to the Profile-most probable k-mer from Dna[i] based on this profile matrix
-            Motifs.append(ProfileMostProbablePattern(Dna[j], k, P))
-        # GreedyMotifSearch checks whether Motifs outscores the current best scoring collection of motifs, BestMotifs
-        if Score(Motifs) < Score(BestMotifs):
-            BestMotifs = Motifs
-    return BestMotifs
+def GreedyMotifSearchWithPseudocounts(Dna, k, t, Workers=1):
+    # BestMotifs starts as the first k-mer of each string in Dna. Every k-mer of Dna[0]
+    # is tried as Motifs[0], and Motifs[j] is the profile-most probable k-mer of Dna[j]
+    # for the profile of Motifs[0:j]; the lowest scoring Motifs win, the earliest start
+    # on a tie. The starts can be split over Workers processes, see GreedySearch in
+    # MotifCore.py.
+    return MotifCore.GreedySearch(Dna, k, t, 1, Workers)
 
 # Input:  A set of kmers Motifs
 # Output: A consensus string of Motifs.
 def Consensus(Motifs):
-    k = len(Motifs[0])
-    profile = ProfileWithPseudocounts(Motifs)
-    consensus = ""
-    for j in range(k):
-        maximum = 0
-        frequentSymbol = ""
-        for symbol in "ACGT":
-            if profile[symbol][j] > maximum:
-                maximum = profile[symbol][j]
-                frequentSymbol = symbol
-        consensus += frequentSymbol
-    return consensus
+    # pseudocounts never change the most common letter, see MotifSet in MotifCore.py
+    return MotifCore.Consensus(Motifs)
 
 # Input:  A set of k-mers Motifs
 # Output: The score of these k-mers.
 def Score(Motifs):
-    count = 0
-    consensus = Consensus(Motifs)
-    for motif in Motifs:
-        for index, letter in enumerate(motif):
-            if letter != consensus[index]:
-                count += 1
-    return count
+    # t · k minus the largest count of every column, see MotifSet in MotifCore.py
+    return MotifCore.Score(Motifs)
 
 # Input:  String Text and profile matrix Profile
 # Output: Probability value
 def Pr(Text, Profile):
-    p = 1
-    # loop through each index(char) in text
-    for index,char in enumerate(Text):
-        for key, profile_lists in sorted(Profile.items()):
-            if char == key:
-                p *= profile_lists[index]
-    return p
+    # multiply the probability of each letter at its index, see Pr in MotifCore.py
+    return MotifCore.Pr(Text, Profile)
 
 # k = 3
 # t = 5
@@ -162,11 +107,12 @@ def Motifs(Profile, Dna, k):
 # Input:  A list of strings Dna, and integers k and t
 # Output: RandomMotifs(Dna, k, t)
 # HINT:   You might not actually need to use t since t = len(Dna), but you may find it convenient
-def RandomMotifs(Dna, k, t):
+# Random: the random number generator to draw from (the random module, or a random.Random)
+def RandomMotifs(Dna, k, t, Random=random):
     n = len(Dna[0])
     random_motifs = []
     for each_string in Dna:
-        random_start = random.randint(0,n-k)
+        random_start = Random.randint(0,n-k)
         random_motifs.append(each_string[random_start:random_start+k])
     return random_motifs
 #
@@ -177,33 +123,104 @@ def RandomMotifs(Dna, k, t):
 
 # Input:  Positive integers k and t, followed by a list of strings Dna
 # Output: return a list of random kmer motifs
-def RandomizedMotifSearch(Dna, k, t):
-    random_motifs = RandomMotifs(Dna, k, t)
-    best_motifs = random_motifs
+def RandomizedMotifSearch(Dna, k, t, Random=random):
+    best_motifs = MotifCore.MotifSet(RandomMotifs(Dna, k, t, Random), 1)
+    # the best score is kept with best_motifs instead of being recomputed each round
+    best_score = best_motifs.Score()
     while True:
-        profile = ProfileWithPseudocounts(random_motifs)
-        check_random = Motifs(profile, Dna, k)
-        if Score(check_random) > Score(best_motifs):
+        profile = best_motifs.Profile()
+        check_random = MotifCore.MotifSet(Motifs(profile, Dna, k), 1)
+        # keep going while the profile-most probable motifs score lower (better)
+        if check_random.Score() < best_score:
             best_motifs = check_random
+            best_score = check_random.Score()
         else:
-            return best_motifs
+            return list(best_motifs)
 
 """
 Input:  Positive integers k and t, followed by a list of strings Dna
 Output: A list containing BestMotifs resulting from running RandomizedMotifSearch(Dna, k, t) 1000 times.
+
+The restarts are independent, so they can be spread over a pool of Workers processes
+(threads on a Python build without the GIL); Workers=None uses every core, and the
+default Workers=1 runs them here one after another. Restart i draws its random numbers from
+its own random.Random(Seed + i), so the result only depends on Seed, never on the
+number of workers or on which worker ran which restart. Without a Seed, one is drawn
+from the random module, so random.seed() still makes a run repeatable. Ties go to
+the lowest restart number, as they would when running the restarts in order.
+
+Each worker receives Dna once when it starts, and is then only sent ranges of
+restart numbers.
 """
-def RepeatedRandomizedMotifSearch(Dna, k, t):
+def RepeatedRandomizedMotifSearch(Dna, k, t, Restarts=1000, Workers=1, Seed=None):
+    BestScore, BestMotifs = _BestOfRuns(_RunRestarts, Dna, k, t, Restarts, Workers, Seed)
+    for i in BestMotifs:
+        print(i)
+    return BestMotifs
+
+"""
+Runs Task(Search, Seed, Start, Stop, *Arguments) over ranges of run numbers 0 to
+Runs - 1, in a pool of Workers as described above, and returns (score, motifs) of
+the best run. Search is (Dna, k, t) and Task returns (score, run number, motifs) of
+the best run in its range.
+
+The serial path and a thread pool hand Search to Task directly. Only a process pool
+keeps it in the module-global _Search of each worker process, so nothing is left
+behind in the caller and calls can be nested or run from several threads at once.
+"""
+def _BestOfRuns(Task, Dna, k, t, Runs, Workers, Seed, *Arguments):
+    if Seed is None:
+        Seed = random.randrange(1 << 32)
+    if Workers is None:
+        Workers = os.cpu_count() or 1
+    Workers = max(1, min(Workers, Runs))
+    Search = (list(Dna), k, t)
+    if Workers == 1:
+        BestScore, _, BestMotifs = Task(Search, Seed, 0, Runs, *Arguments)
+        return BestScore, BestMotifs
+    import concurrent.futures
+    # a few ranges per worker, so that a slow range does not hold up the others
+    step = max(1, -(-Runs // (4 * Workers)))
+    starts = range(0, Runs, step)
+    stops = [min(start + step, Runs) for start in starts]
+    arguments = [itertools.repeat(argument) for argument in Arguments]
+    if getattr(sys, '_is_gil_enabled', lambda: True)():
+        with concurrent.futures.ProcessPoolExecutor(Workers, initializer=_StartWorker, initargs=Search) as pool:
+            results = pool.map(_RunInWorker, itertools.repeat(Task), itertools.repeat(Seed),
+                               starts, stops, *arguments)
+            BestScore, _, BestMotifs = min(results, key=lambda result: result[:2])
+    else:
+        with concurrent.futures.ThreadPoolExecutor(Workers) as pool:
+            results = pool.map(Task, itertools.repeat(Search), itertools.repeat(Seed),
+                               starts, stops, *arguments)
+            BestScore, _, BestMotifs = min(results, key=lambda result: result[:2])
+    return BestScore, BestMotifs
+
+# Dna, k and t of the search, set once per pool worker process by _StartWorker
+_Search = None
+
+def _StartWorker(Dna, k, t):
+    global _Search
+    _Search = (Dna, k, t)
+
+# runs Task on the search this worker process was started with
+def _RunInWorker(Task, Seed, Start, Stop, *Arguments):
+    return Task(_Search, Seed, Start, Stop, *Arguments)
+
+# Output: (score, restart number, motifs) of the best restart numbered from Start to Stop - 1
+def _RunRestarts(Search, Seed, Start, Stop):
+    Dna, k, t = Search
     BestScore = float('inf')      # start the "best score" as infinity
-    BestMotifs = []               # output variable
-    for i in range(1000):         # run RandomizedMotifSearch 1000 times
-        Motifs = RandomizedMotifSearch(Dna, k, t)
+    BestRestart = Start
+    BestMotifs = []
+    for i in range(Start, Stop):
+        Motifs = RandomizedMotifSearch(Dna, k, t, random.Random(Seed + i))
         CurrScore = Score(Motifs)
         if CurrScore < BestScore: # if this set of Motifs is better than BestMotifs, swap
             BestScore = CurrScore
+            BestRestart = i
             BestMotifs = Motifs
-    for i in BestMotifs:
-        print(i)
-    return BestMotifs
+    return BestScore, BestRestart, BestMotifs
 # k = 15
 # t = 20
 # Dna = ["AGTTCACGGAACACCTATTCTGGATCGAGGGAGCTAATGTATGGAGGGTACGCAAGGGATACATAATATGGACTCAAATTATCCTATGAGACTCCAAGGGCACCGAAGAAGCTTCTGATACTCACAGCTAAACAACGGAGCTACAGGATAATGTAGGAGATGGCTCGGTATTCAAGACTCAATAGACAGTTCACGGAACACC",
@@ -238,10 +255,11 @@ in  Probabilities, then return the resulting dictionary
 # divided by the sum of all k-mers' probabilities
 def Normalize(Probabilities):
     probability_sum = sum(Probabilities.values())
-    for key, value in sorted(Probabilities.items()):
-        Probabilities[key] = value / probability_sum
-    return Probabilities
-
+    # a new dictionary, Probabilities itself is left as it was
+    normalized = {}
+    for key, value in Probabilities.items():
+        normalized[key] = value / probability_sum
+    return normalized
 
 # Probabilities = {'A': 0.15, 'B': 0.6, 'C': 0.225, 'D': 0.225, 'E': 0.3}
 # print(Normalize(Probabilities))
@@ -254,24 +272,15 @@ randomly chosen k-mer key with respect to the values in Probabilities
 
 # Input:  A dictionary Probabilities whose keys are k-mers and whose values are the probabilities of these kmers
 # Output: A randomly chosen k-mer with respect to the values in Probabilities
-def WeightedDie(Probabilities):
-    random_float = random.uniform(0,1)
-    input_keys = []
-    input_values = []
-    for key, value in sorted(Probabilities.items()):
-        input_keys.append(key)
-        input_values.append(value)
-
-    current = 0
-    range_of_values = []
-    for i, value in enumerate(input_values):
-        current += value
-        range_of_values.append(current)
-
-    for i, value in enumerate(range_of_values):
-        if value >= random_float:
-            return(input_keys[i])
-
+# Random: the random number generator to draw from (the random module, or a random.Random)
+def WeightedDie(Probabilities, Random=random):
+    random_float = Random.uniform(0,1)
+    input_keys = sorted(Probabilities)
+    # running totals of the values, and a binary search for the first total >= random_float
+    range_of_values = list(itertools.accumulate(Probabilities[key] for key in input_keys))
+    i = bisect.bisect_left(range_of_values, random_float)
+    if i < len(input_keys):
+        return(input_keys[i])
 # Probabilities = {'AA': 0.2, 'AT': 0.4, 'CC': 0.1, 'GG': 0.1, 'TT': 0.2}
 # print(WeightedDie(Probabilities))
 
@@ -283,14 +292,11 @@ that randomly chooses a k-mer from a string Text based on a profile matrix profi
 
 # Input:  A string Text, a profile matrix Profile, and an integer k
 # Output: ProfileGeneratedString(Text, profile, k)
-def ProfileGeneratedString(Text, profile, k):
-    n = len(Text)
-    probabilities = {}
-    for i in range(0,n-k+1):
-        probabilities[Text[i:i+k]] = Pr(Text[i:i+k], profile)
-    probabilities = Normalize(probabilities)
-    return WeightedDie(probabilities)
-
+# the k-mer is drawn by position rather than through a dictionary keyed by k-mer, so
+# a k-mer that occurs more than once keeps one chance per occurrence
+def ProfileGeneratedString(Text, profile, k, Random=random):
+    i = ProfileRandomIndex(Text, k, profile, Random)
+    return Text[i:i+k]
 """
 RandomizedMotifSearch may change all t strings in Motifs in a single iteration.
 This strategy may prove reckless, since some correct motifs (captured in Motifs)
@@ -301,32 +307,81 @@ from the current set of motifs at each iteration and decides to either keep it
 or replace it with a new one.
 """
 
-def GibbsSampler(Dna, k, t, N):
+def GibbsSampler(Dna, k, t, N, Random=random, Patience=None):
     # randomly select k-mers Motifs = (Motif1, …, Motift) in each string from Dna
-    random_motifs = RandomMotifs(Dna, k, t)
-    # ﻿BestMotifs ← Motifs
-    best_motifs = random_motifs
+    motifs = MotifCore.MotifSet(RandomMotifs(Dna, k, t, Random), 1)
+    # BestMotifs ← Motifs
+    best_motifs = list(motifs)
+    best_score = motifs.Score()
+    since_best = 0
     # for j ← 1 to N
     for j in range(N):
-    #     i ← randomly generated integer between 1 and t
-        i = random.randint(0,t)
-    #     Profile ← profile matrix formed from all strings in random_motifs except for random_motifs
-        profile = ProfileWithPseudocounts(random_motifs)
-    #     Motif ← Profile-randomly generated k-mer in the i-th string
-        check_random = Motifs(profile, Dna, k)
-        if Score(check_random) > Score(best_motifs):
-            best_motifs = check_random
+    #     i ← randomly generated integer between 1 and t (0 to t-1 here)
+        i = Random.randrange(t)
+    #     Profile ← profile matrix formed from all strings in Motifs except for Motifs[i]
+        profile = motifs.Profile(Excluding=i)
+    #     Motif[i] ← Profile-randomly generated k-mer in the i-th string
+        start = ProfileRandomIndex(Dna[i], k, profile, Random)
+        motifs.Replace(i, Dna[i][start:start+k])
+    #     if Score(Motifs) < Score(BestMotifs), BestMotifs ← Motifs
+        if motifs.Score() < best_score:
+            best_motifs = list(motifs)
+            best_score = motifs.Score()
+            since_best = 0
         else:
-            return best_motifs
+            since_best += 1
+            # the chain has settled, stop early
+            if Patience is not None and since_best >= Patience:
+                break
+    return best_motifs
+
+"""
+Picks the start of a k-mer of Text at random, each start weighted by the probability
+of its k-mer under Profile (see ProfileWeights in MotifCore.py). The profile changes
+at every Gibbs step, so the weights are only used for a single draw.
+"""
+def ProfileRandomIndex(Text, k, Profile, Random=random):
+    weights = MotifCore.ProfileWeights(Text, k, Profile)
+    return Random.choices(range(len(weights)), weights)[0]
+"""
+The Gibbs sampler can get stuck, so it is usually run many times from different
+random motifs (chains) keeping the best result, like RepeatedRandomizedMotifSearch.
+Chains can run in a pool of Workers (the default Workers=1 runs them here, None uses
+every core) and chain i draws from random.Random(Seed + i), so the result only
+depends on Seed. With Patience, a chain stops once its best score
+has not improved for Patience steps in a row instead of always running N steps.
+
+Input:  A list of strings Dna, integers k, t and N, and the number of Chains
+Output: the best motifs found by any of the chains
+"""
+def RepeatedGibbsSampler(Dna, k, t, N, Chains=20, Workers=1, Seed=None, Patience=None):
+    BestScore, BestMotifs = _BestOfRuns(_RunGibbsChains, Dna, k, t, Chains, Workers, Seed, N, Patience)
+    return BestMotifs
+
+# Output: (score, chain number, motifs) of the best chain numbered from Start to Stop - 1
+def _RunGibbsChains(Search, Seed, Start, Stop, N, Patience):
+    Dna, k, t = Search
+    BestScore = float('inf')
+    BestChain = Start
+    BestMotifs = []
+    for i in range(Start, Stop):
+        Motifs = GibbsSampler(Dna, k, t, N, random.Random(Seed + i), Patience)
+        CurrScore = Score(Motifs)
+        if CurrScore < BestScore:
+            BestScore = CurrScore
+            BestChain = i
+            BestMotifs = Motifs
+    return BestScore, BestChain, BestMotifs
 
-k = 8
-t = 5
-N = 100
+if __name__ == "__main__":
+    k = 8
+    t = 5
+    N = 100
 
-Dna = ["CGCCCCTCTCGGGGGTGTTCAGTAACCGGCCA",
-    "GGGCGAGGTATGTGTAAGTGCCAAGGTGCCAG",
-    "TAGTACCGAGACCGAAAGAAGTATACAGGCGT",
-    "TAGATCAAGTTTCAGGTGCACGTCGGTGAACC",
-    "AATCCACCAGCTCCACGTGCAATGTTGGCCTA"]
+    Dna = ["CGCCCCTCTCGGGGGTGTTCAGTAACCGGCCA",
+        "GGGCGAGGTATGTGTAAGTGCCAAGGTGCCAG",
+        "TAGTACCGAGACCGAAAGAAGTATACAGGCGT",
+        "TAGATCAAGTTTCAGGTGCACGTCGGTGAACC",
+        "AATCCACCAGCTCCACGTGCAATGTTGGCCTA"]
 
-print(GibbsSampler(Dna, k, t, N))
+    print(GibbsSampler(Dna, k, t, N))
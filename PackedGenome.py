@@ -0,0 +1,249 @@
+import bisect
+import mmap
+import os
+import re
+"""
+A Python string stores one byte per base, so a 5 Mb bacterial genome costs 5 MB
+and every Genome[i:j] or Genome + Genome[0:n//2] makes another copy. Since DNA
+only has four letters, each base fits in 2 bits (A = 00, C = 01, G = 10, T = 11,
+the same base 4 numbers used by PatternToIndex in Clump.py), so four bases can be
+packed into a single byte.
+
+Letters other than A, C, G and T (N and the other IUPAC ambiguity codes) do not
+fit in 2 bits. They are packed as A and remembered separately as runs of
+(start, stop, letter), which stays small because they usually come in long
+stretches of N.
+
+Bases are stored in upper case, however the genome was built: lower case in FASTA
+files only marks repeats, so "acgt" packs the same as "ACGT" instead of becoming
+ambiguous runs.
+
+A PackedGenome behaves like a read-only string: len(), indexing, iteration,
+comparison with str and slicing all work, so it can be handed to PatternCount,
+Skew, ComputingFrequencies and friends unchanged. Slicing with step 1 returns
+another PackedGenome that shares the packed bytes instead of copying them.
+"""
+
+# bytes.translate tables between letters and their 2 bit numbers; every other
+# letter is packed as A (0) and kept in the ambiguous runs instead
+LetterToCode = bytes(max(b'ACGT'.find(byte), 0) for byte in range(256))
+CodeToLetter = bytes.maketrans(b'\x00\x01\x02\x03', b'ACGT')
+# every letter that is not A, C, G or T, grouped into runs of the same letter
+AmbiguousRun = re.compile(rb'([^ACGT])\1*')
+# how many bases are decoded at a time when iterating
+ChunkSize = 1 << 16
+
+"""
+Pack a bytes object of 2 bit numbers (0-3), whose length is a multiple of 4,
+into bytes holding four bases each, first base in the two highest bits.
+
+Rather than looping over every base, the numbers for the 1st, 2nd, 3rd and 4th
+base of each byte are taken with a stride of 4 and turned into big integers, so
+shifting a whole integer by 6, 4 or 2 bits moves every base into its place in
+one operation.
+"""
+def PackCodes(Codes):
+    m = len(Codes) // 4
+    packed = 0
+    for offset, shift in enumerate((6, 4, 2, 0)):
+        packed |= int.from_bytes(Codes[offset::4], 'big') << shift
+    return packed.to_bytes(m, 'big')
+
+"""
+Reverse of PackCodes: expand packed bytes back into one 2 bit number per byte.
+"""
+def UnpackCodes(Packed):
+    m = len(Packed)
+    value = int.from_bytes(Packed, 'big')
+    threes = int.from_bytes(b'\x03' * m, 'big')
+    codes = bytearray(4 * m)
+    for offset, shift in enumerate((6, 4, 2, 0)):
+        codes[offset::4] = ((value >> shift) & threes).to_bytes(m, 'big')
+    return codes
+
+
+class PackedGenome:
+    """
+    input:  Text- DNA string (or bytes) to pack
+            ex: "GATTACANNA"
+    """
+    def __init__(self, Text=''):
+        if isinstance(Text, str):
+            Text = Text.encode('latin-1')
+        Text = Text.upper()
+        self._length = len(Text)
+        self._start = 0
+        self._runs = []
+        for run in AmbiguousRun.finditer(Text):
+            self._runs.append((run.start(), run.end(), run.group(1).decode('latin-1')))
+        self._run_starts = [run[0] for run in self._runs]
+        # ambiguous letters are packed as A, their real letter is kept in _runs
+        codes = Text.translate(LetterToCode)
+        codes += b'\x00' * (-len(codes) % 4)
+        self._data = PackCodes(codes)
+
+    """
+    Build a PackedGenome for every record in a FASTA file. The file is memory
+    mapped and packed ChunkSize bytes at a time, so the sequence is never held in
+    memory as one string. Letters are upper-cased, as in the constructor.
+
+    input:  Path- path to a FASTA file
+    output: generator yielding (name, PackedGenome) for each record; an empty file
+            has no records, and a header with no sequence gives an empty PackedGenome
+    """
+    @classmethod
+    def FromFasta(cls, Path):
+        with open(Path, 'rb') as handle:
+            # an empty file cannot be memory mapped, and holds no records anyway
+            if not os.fstat(handle.fileno()).st_size:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                position = 0
+                size = len(data)
+                while position < size:
+                    if data[position:position+1] != b'>':
+                        position = data.find(b'\n>', position)
+                        if position == -1:
+                            break
+                        position += 1
+                        continue
+                    header_end = data.find(b'\n', position)
+                    if header_end == -1:
+                        header_end = size
+                    name = data[position+1:header_end].decode().strip()
+                    end = data.find(b'\n>', header_end)
+                    end = size if end == -1 else end + 1
+                    yield name, cls._FromRegion(data, header_end + 1, end)
+                    position = end
+
+    @classmethod
+    def _FromRegion(cls, Data, Start, Stop):
+        genome = cls.__new__(cls)
+        genome._start = 0
+        genome._runs = []
+        packed = bytearray()
+        leftover = b''
+        length = 0
+        for block_start in range(Start, Stop, ChunkSize):
+            block = Data[block_start:min(block_start + ChunkSize, Stop)]
+            block = block.translate(None, b'\r\n \t').upper()
+            for run in AmbiguousRun.finditer(block):
+                letter = run.group(1).decode('latin-1')
+                run_start, run_stop = length + run.start(), length + run.end()
+                # join a run that was split across two blocks
+                if genome._runs and genome._runs[-1][1] == run_start and genome._runs[-1][2] == letter:
+                    run_start = genome._runs.pop()[0]
+                genome._runs.append((run_start, run_stop, letter))
+            length += len(block)
+            codes = leftover + block.translate(LetterToCode)
+            usable = len(codes) - len(codes) % 4
+            packed += PackCodes(codes[:usable])
+            leftover = codes[usable:]
+        if leftover:
+            packed += PackCodes(leftover + b'\x00' * (4 - len(leftover)))
+        genome._length = length
+        genome._run_starts = [run[0] for run in genome._runs]
+        genome._data = bytes(packed)
+        return genome
+
+    def __len__(self):
+        return self._length
+
+    """
+    Decode bases Start to Stop (relative to this genome) back into a string.
+    """
+    def Decode(self, Start=0, Stop=None):
+        if Stop is None or Stop > self._length:
+            Stop = self._length
+        if Start >= Stop:
+            return ''
+        first = self._start + Start
+        last = self._start + Stop
+        letters = UnpackCodes(self._data[first >> 2:(last + 3) >> 2]).translate(CodeToLetter)
+        offset = first & ~3
+        letters = letters[first - offset:last - offset]
+        # put back the ambiguous letters that overlap this range
+        i = max(bisect.bisect_right(self._run_starts, first) - 1, 0)
+        while i < len(self._runs) and self._runs[i][0] < last:
+            run_start, run_stop, letter = self._runs[i]
+            run_start, run_stop = max(run_start, first), min(run_stop, last)
+            if run_start < run_stop:
+                letters[run_start - first:run_stop - first] = letter.encode('latin-1') * (run_stop - run_start)
+            i += 1
+        return letters.decode('latin-1')
+
+    """
+    Yield the genome as consecutive strings of at most Size bases, for code that
+    wants to stream through it without decoding everything at once.
+    """
+    def Chunks(self, Size=ChunkSize):
+        for start in range(0, self._length, Size):
+            yield self.Decode(start, start + Size)
+
+    def __iter__(self):
+        for chunk in self.Chunks():
+            yield from chunk
+
+    def __getitem__(self, Key):
+        if isinstance(Key, slice):
+            start, stop, step = Key.indices(self._length)
+            if step != 1:
+                return self.Decode(0, self._length)[Key]
+            # a view on the same packed bytes, nothing is copied
+            view = PackedGenome.__new__(PackedGenome)
+            view._data = self._data
+            view._runs = self._runs
+            view._run_starts = self._run_starts
+            view._start = self._start + start
+            view._length = max(stop - start, 0)
+            return view
+        if Key < 0:
+            Key += self._length
+        if not 0 <= Key < self._length:
+            raise IndexError("PackedGenome index out of range")
+        position = self._start + Key
+        i = bisect.bisect_right(self._run_starts, position) - 1
+        if i >= 0 and position < self._runs[i][1]:
+            return self._runs[i][2]
+        return 'ACGT'[(self._data[position >> 2] >> (6 - 2 * (position & 3))) & 3]
+
+    def __str__(self):
+        return self.Decode()
+
+    def __repr__(self):
+        return 'PackedGenome(length=%d)' % self._length
+
+    def __eq__(self, Other):
+        if isinstance(Other, (str, PackedGenome)):
+            return len(self) == len(Other) and str(self) == str(Other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, Other):
+        return str(self) + str(Other)
+
+    def __radd__(self, Other):
+        return str(Other) + str(self)
+
+    """
+    Count the (possibly overlapping) occurrences of Pattern, decoding the genome
+    one chunk at a time. Consecutive chunks overlap by len(Pattern)-1 bases so an
+    occurrence spanning two chunks is still found, and counted only once.
+
+    output: sorted list of starting positions of Pattern
+    """
+    def Find(self, Pattern):
+        positions = []
+        m = len(Pattern)
+        if m == 0 or m > self._length:
+            return positions
+        step = max(ChunkSize, m)
+        for start in range(0, self._length - m + 1, step):
+            chunk = self.Decode(start, start + step + m - 1)
+            i = chunk.find(Pattern)
+            while i != -1:
+                positions.append(start + i)
+                i = chunk.find(Pattern, i + 1)
+        return positions
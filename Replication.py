@@ -1,3 +1,23 @@
+import collections
+import itertools
+import operator
+import sys
+from array import array
+from Clump import IndexToPattern, PatternToIndex, ReverseComplementIndex, RollingCanonicalIndex, RollingIndexPairs, RollingPatternToIndex
+from MotifCore import HammingDistance
+"""
+GenomeIndex and PackedGenome are not imported here: a genome can only be one of them
+if the caller already imported its module, so looking it up in sys.modules is
+enough, and importing Replication does not load either of them.
+"""
+def IsGenomeIndex(Genome):
+    module = sys.modules.get('GenomeIndex')
+    return module is not None and isinstance(Genome, module.GenomeIndex)
+
+def IsPackedGenome(Genome):
+    module = sys.modules.get('PackedGenome')
+    return module is not None and isinstance(Genome, module.PackedGenome)
+
 """
 We start sliding the window at position 0 of Text, but where should we stop?
 In general, the final k-mer of a string of length n begins at position n-k;
@@ -13,6 +33,12 @@ output:   the number of times Pattern appears in Text
           ex: 2
 """
 def PatternCount(Pattern, Text):
+    # an indexed genome answers with two binary searches over its suffix array
+    if IsGenomeIndex(Text):
+        return Text.Count(Pattern)
+    # a PackedGenome searches itself chunk by chunk instead of slicing out every window
+    if IsPackedGenome(Text):
+        return len(Text.Find(Pattern))
     count = 0
     # determine index value we can stop checking for pattern (see explaination above)
     for i in range(len(Text)-len(Pattern)+1):
@@ -25,6 +51,58 @@ def PatternCount(Pattern, Text):
 #Text = "GACCATCAAAACTGATAAACTACTTAAAAATCAGT"
 #Pattern = "AAA"
 #print(PatternCount(Pattern, Text))
+"""
+Rather than calling PatternCount once for every position (which rescans the whole
+text each time), we can slide a window down Text only once and keep a running
+tally of every k-mer we have seen so far in a dictionary. The tally is keyed by the
+base 4 index of each k-mer (see RollingPatternToIndex in Clump.py), which is turned
+back into a string only once per distinct k-mer at the end.
+
+Because dictionaries remember insertion order, the keys come out in the order in
+which each k-mer first appears in Text.
+
+input:    text- full base sequence string
+          ex: "CGATATATCCATAG"
+          k or k-mer is the length of pattern we are searching for (ex: 3-mer "ATA")
+          ex: 3
+output:   FrequencyTable is a dictionary mapping every k-mer in Text to the number
+          of times it appears
+          ex: {'CGA': 1, 'GAT': 1, 'ATA': 3, 'TAT': 2, 'ATC': 1, 'TCC': 1, 'CCA': 1, 'CAT': 1, 'TAG': 1}
+
+With Canonical=True a k-mer and its reverse complement share one entry, keyed by the
+alphabetically first of the two (see RollingCanonicalIndex in Clump.py), which
+counts the k-mers of both strands with half the entries.
+          ex: FrequencyTable("CGATATATCCATAG", 3, Canonical=True)
+              {'CGA': 1, 'ATC': 2, 'ATA': 5, 'GGA': 1, 'CCA': 1, 'ATG': 1, 'CTA': 1}
+
+complexity of this algorithm is O(|Text| · k)
+"""
+def FrequencyTable(Text, k, Canonical=False):
+    Table = {}
+    Counts = {}
+    try:
+        # count the base 4 index of every k-mer, rolled along Text in O(1) per position
+        # strict, so that k-mers with other letters are counted as strings below
+        for index in (RollingCanonicalIndex if Canonical else RollingPatternToIndex)(Text, k, "strict"):
+            # get returns 0 the first time we see a pattern
+            Counts[index] = Counts.get(index, 0) + 1
+    except ValueError:
+        # letters other than A, C, G and T have no index, so count the k-mers themselves
+        for i in range(len(Text)-k+1):
+            # str() so a PackedGenome slice is stored as a plain string
+            Pattern = str(Text[i:i+k])
+            if Canonical:
+                Pattern = min(Pattern, ReverseComplement(Pattern, "lenient"))
+            Table[Pattern] = Table.get(Pattern, 0) + 1
+        return Table
+    for index in Counts:
+        Table[IndexToPattern(index, k)] = Counts[index]
+    return Table
+
+# Text = "CGATATATCCATAG"
+# k = 3
+# print(FrequencyTable(Text, k))
+
 """
 input:    text- full base sequence string
           ex: "CGATATATCCATAG"
@@ -35,11 +113,11 @@ output:   Count is a dictionary that stores results of PatternCount
 """
 def CountDict(Text, k):
     Count = {}
+    # count every k-mer in a single pass instead of calling PatternCount at every position
+    Table = FrequencyTable(Text, k)
     # same range as range(len(Text)-len(Pattern)+1) above because k == len(Pattern)
     for i in range(len(Text)-k+1):
-        # flexible creation of pattern so we don't have to hardcode it directly into PatternCount
-        Pattern = Text[i:i+k]
-        Count[i] = PatternCount(Pattern, Text)
+        Count[i] = Table[Text[i:i+k]]
     return Count
 
 """
@@ -59,69 +137,139 @@ input:text- full base sequence string
       ex: "ACGTTGCATGTCGCATGATGCATGAGAGCT"
       k or k-mer is the length of pattern we are searching for (ex: 3-mer "ATA")
       ex: 4
-output: list of frequent patterns
-        ex: GCAT CATG GCAT CATG GCAT CATG
+        Canonical- count a k-mer and its reverse complement together, and report
+        only the alphabetically first of the two (see FrequencyTable)
+output: list of frequent patterns, in the order they first appear in Text
+        ex: GCAT CATG
 
-complexity of this algorithm as O(|Text|2 · k)
+complexity of this algorithm is O(|Text| · k) because FrequencyTable only slides
+the window down Text once
 """
-def FrequentWords(Text, k):
+def FrequentWords(Text, k, Canonical=False):
     # initialize empty list
     FrequentPatterns = []
-    # store Count dictionary that stores result of PatternCount (the number of a times a pattern appears in the text)
-    Count = CountDict(Text, k)
-    # Count.values() returns a list of all the values in the in Count dictionary
-    # max(Count.values()) returns the maximum value in the Count dictionary
-    m = max(Count.values())
-    # loop through Count dictionary
-    for i in Count:
+    # store the number of times each k-mer appears in the text
+    Table = FrequencyTable(Text, k, Canonical)
+    # max(Table.values()) returns the maximum value in the frequency table
+    m = max(Table.values())
+    # keys are already unique and in order of first appearance in Text
+    for Pattern in Table:
         # if the number of times the pattern appears in text == max value
-        if Count[i] == m:
+        if Table[Pattern] == m:
             # push the text pattern string into the FrequentPatterns list
-            FrequentPatterns.append(Text[i:i+k])
-    # avoid duplicate frequent words
-    FrequentPatternsNoDuplicates = RemoveDuplicates(FrequentPatterns)
-    return FrequentPatternsNoDuplicates
+            FrequentPatterns.append(Pattern)
+    return FrequentPatterns
 
 # Text = "ACGTTGCATGTCGCATGATGCATGAGAGCT"
 # k = 4
 # print(FrequentWords(Text,k))
 
+"""
+The complement of every letter comes from one translation table, so a whole string
+is complemented by a single str.translate and reversed by a slice. Besides A, C, G
+and T the table covers the IUPAC ambiguity codes (R = A or G pairs with Y = C or T,
+K with M, B with V, D with H, while S, W and N are their own complements) and lower
+case letters, which FASTA files use for repeats.
+
+Any other letter is handled according to Errors:
+    "strict"   raise a ValueError naming the letter and its position
+    "lenient"  write N in its place, so the result keeps the length of Pattern and
+               every position still lines up with the input
+"""
+ComplementTable = str.maketrans("ACGTRYKMBVDHSWNacgtrykmbvdhswn", "TGCAYRMKVBHDSWNtgcayrmkvbhdswn")
+# deletes every letter that ComplementTable knows, leaving only the unknown ones
+UnknownLetters = str.maketrans('', '', "ACGTRYKMBVDHSWNacgtrykmbvdhswn")
+
 """
 input: Pattern - DNA string pattern
        ex: Pattern = 'ATGATCAAG'
 output: The reverse complement of a DNA string Pattern is the string formed by
         taking the complementary nucleotide of each nucleotide in Pattern, then
         reversing the resulting string
-       ex: 'ACCGGGTTTT'
-"""
-def ReverseComplement(Pattern):
-    # transform string into list
-    input_list = list(Pattern)
-    # create list to store complimentary string
-    comp_list = []
-    # loop through list and transform each nucleotide in DNA to its complimentary nucleotide
-    for char in input_list:
-        if char == 'A':
-            comp_list.append('T')
-        elif char == 'T':
-            comp_list.append('A')
-        elif char == 'C':
-            comp_list.append('G')
-        elif char == 'G':
-            comp_list.append('C')
-        else:
-            print('Unable to determine nucleotide compliment')
+       ex: 'CTTGATCAT'
+"""
+def ReverseComplement(Pattern, Errors="strict"):
+    if not isinstance(Pattern, str):
+        # a PackedGenome, or any other sequence of letters
+        Pattern = str(Pattern) if IsPackedGenome(Pattern) else ''.join(Pattern)
+    return CheckLetters(Pattern, Errors).translate(ComplementTable)[::-1]
+
+"""
+Applies the Errors policy of ReverseComplement to the letters of Text that have no
+complement; letters in Keep are left alone.
+"""
+def CheckLetters(Text, Errors="strict", Keep=''):
+    unknown = Text.translate(UnknownLetters)
+    if Keep:
+        unknown = unknown.translate(str.maketrans('', '', Keep))
+    if not unknown:
+        return Text
+    if Errors == "lenient":
+        return Text.translate(str.maketrans(dict.fromkeys(unknown, 'N')))
+    if Errors != "strict":
+        raise ValueError("Errors must be 'strict' or 'lenient', not " + repr(Errors))
+    position = next(i for i, letter in enumerate(Text) if letter in unknown)
+    raise ValueError("no complement for %r at position %d" % (Text[position], position))
 
-    # reverse compliment list
-    comp_list.reverse()
-    # transform reversed compliment list back into a string
-    revComp = ''.join(comp_list)
-    # return reversed compliment string
-    return revComp
+"""
+Batch mode: the reverse complements of many k-mers at once. The k-mers are joined
+with newlines so the table is applied once over all of them; reversing the joined
+string reverses each k-mer and also their order, which the final slice undoes.
+
+input:  Patterns- list of DNA strings
+output: list with the reverse complement of each
+        ex: ReverseComplements(['ATG', 'GGCA'])
+            ['CAT', 'TGCC']
+"""
+def ReverseComplements(Patterns, Errors="strict"):
+    Patterns = list(Patterns)
+    if not Patterns:
+        return []
+    joined = CheckLetters('\n'.join(Patterns), Errors, Keep='\n')
+    return joined.translate(ComplementTable)[::-1].split('\n')[::-1]
+
+"""
+Streaming mode for chromosome-sized sequences: the reverse complement is handed out
+in pieces of at most Size letters, first piece first, without building it as one
+string. The genome is read backwards one piece at a time, so it has to allow random
+access: a string, or a PackedGenome (PackedGenome.FromFasta packs a FASTA record
+without holding it as one string). A stream of chunks would have to be read to its
+end before the first piece could be given out, so it is not accepted.
+
+input:  Genome- DNA string or PackedGenome
+output: generator of the pieces of ReverseComplement(Genome), in order
+"""
+def ReverseComplementChunks(Genome, Size=None, Errors="strict"):
+    if not (isinstance(Genome, str) or IsPackedGenome(Genome)):
+        raise TypeError("ReverseComplementChunks needs a string or PackedGenome, not " + type(Genome).__name__)
+    if Size is None:
+        Size = ChunkSize
+    return (ReverseComplement(Genome[max(stop - Size, 0):stop], Errors)
+            for stop in range(len(Genome), 0, -Size))
 
 #Pattern = 'GATTACA'
 #print(ReverseComplement(Pattern))
 
+"""
+ReverseComplementIndex for a whole NumPy array of indices at once (k <= 32, such as
+the output of PatternToIndexArray in Clump.py). XOR with k threes complements every
+letter; the letters are then reversed inside the 64 bit word by swapping neighbouring
+2 bit letters, then neighbouring pairs of letters, then the bytes, and shifted back
+down to k letters. NumPy is only imported when this function is called.
+
+input:  Indices- array of base 4 indices of k-mers, and k
+output: uint64 array with the index of the reverse complement of each
+"""
+def ReverseComplementIndexArray(Indices, k):
+    import numpy as np
+    words = np.asarray(Indices, dtype=np.uint64) ^ np.uint64((1 << (2 * k)) - 1)
+    for shift, mask in ((2, 0x3333333333333333), (4, 0x0F0F0F0F0F0F0F0F)):
+        mask = np.uint64(mask)
+        shift = np.uint64(shift)
+        words = ((words >> shift) & mask) | ((words & mask) << shift)
+    words = words.byteswap()
+    return words >> np.uint64(64 - 2 * k) if k else np.zeros_like(words)
+
 """
 However, before concluding that we have found the DnaA box of Vibrio cholerae,
 the careful bioinformatician should check if there are other short regions in the
@@ -139,6 +287,10 @@ output: All starting positions in Genome where Pattern appears as a substring
        ex: 1 3 9
 """
 def PatternMatching(Pattern, Genome):
+    if IsGenomeIndex(Genome):
+        return ' '.join(str(number) for number in Genome.Locate(Pattern))
+    if IsPackedGenome(Genome):
+        return ' '.join(str(number) for number in Genome.Find(Pattern))
     # create empty list for result
     positions = []
     # determine index value we can stop checking for pattern
@@ -165,13 +317,8 @@ are sliding a giant window, we should account for windows that “wrap around”
 end of Genome. To do so, we will define a string ExtendedGenome as Genome+Genome[0:n//2]
 """
 def SymbolArray(Genome, symbol):
-    array = {}
-    n = len(Genome)
-    ExtendedGenome = Genome + Genome[0:n//2]
-    print(ExtendedGenome)
-    for i in range(n):
-        array[i] = PatternCount(symbol, ExtendedGenome[i:i+(n//2)])
-    return array
+    # windows are counted from prefix sums without building ExtendedGenome, see SymbolArrays
+    return dict(enumerate(SymbolArrays(Genome, symbol)[symbol]))
 
 # Genome = "GATATATGCATATACTT"
 # ExtendedGenome = GATATATGCATATACTTGATATATG
@@ -194,24 +341,96 @@ Output: The number of times Pattern appears in Text
 """
 
 def FasterSymbolArray(Genome, symbol):
-    array = {}
-    n = len(Genome)                                     # n = 8
-    ExtendedGenome = Genome + Genome[0:n//2]            # ExtendedGenome = AAAAGGGGAAAA
-    array[0] = PatternCount(symbol, Genome[0:n//2])     # {0: 4}
-    for i in range(1, n):                               # from 1 up to but not including 8
-        array[i] = array[i-1]                           # array[1] = array[0] so array[1] = {0: 4}
-        # if previous index matches symbol, subtract one
-        if ExtendedGenome[i-1] == symbol:               # if ExtendedGenome[0] == A
-            array[i] = array[i]-1                           # array[1] = 4 - 1 = 3 so array[1] = {0: 3}
-        # if next index matches symbol, add one
-        if ExtendedGenome[i+(n//2)-1] == symbol:        # if ExtendedGenome[4] == A
-            array[i] = array[i]+1                           # array[1] = {0: 4}
-    return array
+    return dict(enumerate(SymbolArrays(Genome, symbol)[symbol]))
 
 # Genome = "AAAAGGGG"
 # symbol = "A"
 # print(FasterSymbolArray(Genome, symbol))
 
+"""
+Even the faster version walks through an extended copy of the genome once per
+symbol. With a prefix sum array, where Prefix[j] is the number of times symbol
+appears in Genome[0:j], the count in any window is a single subtraction:
+
+    window i to i+n//2 (inside the genome)   Prefix[i+n//2] - Prefix[i]
+    window that wraps around the end          Prefix[n] - Prefix[i] + Prefix[i+n//2-n]
+
+so no ExtendedGenome is needed. The prefix sums for all symbols are built in one
+pass over the genome (chunk by chunk, so a PackedGenome is never decoded all at
+once), and the subtractions are done with map over whole arrays rather than one
+Python step per position.
+
+input:  Genome- DNA string or PackedGenome
+        Symbols- the symbols to count (default all four nucleotides)
+        NumPy- return NumPy int32 arrays instead of array('i')
+output: dictionary mapping each symbol to an array of length len(Genome) whose
+        i-th value is the number of times symbol appears in the circular window
+        of length len(Genome)//2 starting at i
+        ex: SymbolArrays("AAAAGGGG", "A")
+            {'A': array('i', [4, 3, 2, 1, 0, 1, 2, 3])}
+"""
+def SymbolArrays(Genome, Symbols="ACGT", NumPy=False):
+    if NumPy:
+        return NumPySymbolArrays(Genome, Symbols)
+    # prefix[symbol][j] = occurrences of symbol in Genome[0:j]
+    prefix = {}
+    # bytes.translate table turning symbol into 1 and every other letter into 0
+    hit_tables = {}
+    for symbol in Symbols:
+        prefix[symbol] = array('i', [0])
+        table = bytearray(256)
+        table[ord(symbol)] = 1
+        hit_tables[symbol] = bytes(table)
+    for chunk in SkewChunks(Genome):
+        chunk = chunk.encode('latin-1')
+        for symbol in Symbols:
+            values = itertools.accumulate(chunk.translate(hit_tables[symbol]), initial=prefix[symbol][-1])
+            next(values)
+            prefix[symbol].extend(values)
+    counts = {}
+    for symbol in Symbols:
+        Prefix = prefix[symbol]
+        n = len(Prefix) - 1
+        h = n // 2
+        if h == 0:
+            counts[symbol] = array('i', bytes(4 * n))
+            continue
+        # windows that fit inside the genome, i = 0 to n-h
+        inside = map(operator.sub, Prefix[h:n+1], Prefix[0:n-h+1])
+        # windows that wrap around the end, i = n-h+1 to n-1
+        wrapped = map(operator.sub, map(operator.add, Prefix[1:h], itertools.repeat(Prefix[n])), Prefix[n-h+1:n])
+        counts[symbol] = array('i', itertools.chain(inside, wrapped))
+    return counts
+
+"""
+Same as SymbolArrays, with the prefix sums and window subtractions done by NumPy.
+NumPy is only imported when this function is called.
+"""
+def NumPySymbolArrays(Genome, Symbols="ACGT"):
+    import numpy as np
+    pieces = {}
+    for symbol in Symbols:
+        pieces[symbol] = [np.zeros(1, dtype=np.int32)]
+    for chunk in SkewChunks(Genome):
+        letters = np.frombuffer(chunk.encode('latin-1'), dtype=np.uint8)
+        for symbol in Symbols:
+            values = np.cumsum(letters == ord(symbol), dtype=np.int32) + pieces[symbol][-1][-1]
+            if len(values):
+                pieces[symbol].append(values)
+    counts = {}
+    for symbol in Symbols:
+        Prefix = np.concatenate(pieces[symbol])
+        n = len(Prefix) - 1
+        h = n // 2
+        if h == 0:
+            counts[symbol] = np.zeros(n, dtype=np.int32)
+        else:
+            counts[symbol] = np.concatenate((Prefix[h:n+1] - Prefix[0:n-h+1], Prefix[1:h] + Prefix[n] - Prefix[n-h+1:n]))
+    return counts
+
+# Genome = "AAAAGGGG"
+# print(SymbolArrays(Genome))
+
 """
 We will keep track of the difference between the total number of occurrences of G
 and the total number of occurrences of C that we have encountered so far in
@@ -223,38 +442,119 @@ Otherwise, Skew[i] is equal to Skew[i-1]
 """
 
 def Skew(Genome):
-    skew = {}
-    n = len(Genome)
-    skew[0] = 0
-    for i in range(1, n + 1):
-        skew[i] = skew[i-1]
-        if Genome[i - 1] == 'C':
-            skew[i] = skew[i] - 1
-        elif Genome[i - 1] == 'G':
-            skew[i] = skew[i] + 1
-    return skew
+    # same values as before, kept as a dictionary for code that indexes it by position
+    return dict(enumerate(SkewArray(Genome)))
 
 # Genome = "GAGCCACCGCGATA"
 # print(Skew(Genome))
 
 """
-Minimum Skew Problem:  Find a position in a genome where the skew diagram attains a minimum.
- Input: A DNA string Genome. 
+The skew only ever depends on the previous value and the current letter, so there
+is no need to hold the whole genome (or a dictionary with one entry per base) in
+memory. SkewChunks splits its input into pieces that can be processed one at a
+time: a string is sliced into pieces of ChunkSize letters, a PackedGenome decodes
+itself piece by piece, and anything else is assumed to already be an iterable of
+string chunks (for example the chunks of a record from ReadFastaChunks).
+"""
+ChunkSize = 1 << 16
+# change in skew for each letter, indexed by its byte value
+SkewSteps = [0] * 256
+SkewSteps[ord('G')] = 1
+SkewSteps[ord('C')] = -1
+
+def SkewChunks(Genome):
+    if IsPackedGenome(Genome):
+        yield from Genome.Chunks(ChunkSize)
+    elif isinstance(Genome, str):
+        for start in range(0, len(Genome), ChunkSize):
+            yield Genome[start:start+ChunkSize]
+    else:
+        yield from Genome
+
+"""
+Compact skew array: Skew[0] to Skew[len(Genome)] stored as 32 bit integers in an
+array('i') (4 bytes per position instead of a dictionary entry), or as a NumPy
+int32 array when NumPy is True, which is convenient for plotting.
+
+input:  Genome- DNA string, PackedGenome or iterable of string chunks
+output: array of skew values
+        ex: SkewArray("GAGCCACCGCGATA")
+            array('i', [0, 1, 1, 2, 1, 0, 0, -1, -2, -1, -2, -1, -1, -1, -1])
+"""
+def SkewArray(Genome, NumPy=False):
+    if NumPy:
+        import numpy as np
+        steps = np.zeros(256, dtype=np.int32)
+        steps[ord('G')] = 1
+        steps[ord('C')] = -1
+        pieces = [np.zeros(1, dtype=np.int32)]
+        skew = 0
+        for chunk in SkewChunks(Genome):
+            values = np.cumsum(steps[np.frombuffer(chunk.encode('latin-1'), dtype=np.uint8)], dtype=np.int32) + skew
+            if len(values):
+                skew = int(values[-1])
+                pieces.append(values)
+        return np.concatenate(pieces)
+    skew = array('i', [0])
+    for chunk in SkewChunks(Genome):
+        # accumulate runs in C, starting from the last value of the previous chunk
+        values = itertools.accumulate(map(SkewSteps.__getitem__, chunk.encode('latin-1')), initial=skew[-1])
+        next(values)
+        skew.extend(values)
+    return skew
+
+# Genome = "GAGCCACCGCGATA"
+# print(SkewArray(Genome))
+
+"""
+Minimum Skew Problem:  Find a position in a genome where the skew diagram attains a minimum.
+ Input: A DNA string Genome. 
  ex: TAAAGACTGCCGAGAGGCCAACACGAGTGCTAGAACGAGGGGCGTAAACGCGGGTCCGAT
- Output: All integer(s) i minimizing Skew[i] among all values of i (from 0 to len(Genome)).
+ Output: All integer(s) i minimizing Skew[i] among all values of i (from 0 to len(Genome)).
  ex: 11 24
 """
 def MinimumSkew(Genome):
-    positions = []
-    skew = Skew(Genome)
-    n = len(Genome)
+    return StreamingMinimumSkew(SkewChunks(Genome))
+
+"""
+Single pass version of MinimumSkew: the running skew, the minimum seen so far and
+the positions where it was reached are updated chunk by chunk, so memory does not
+grow with the length of the genome. Because it only needs the chunks in order,
+a chromosome can be streamed straight from disk.
+
+input:  Chunks- iterable of DNA strings that together make up the genome
+        ex: ["TAAAGACTGCCGAGAGGCCAACACGAGTGC", "TAGAACGAGGGGCGTAAACGCGGGTCCGAT"]
+output: All integer(s) i minimizing Skew[i], from 0 to the total length
+        ex: [11, 24]
+"""
+def StreamingMinimumSkew(Chunks):
     minimum = 0
-    for i in range(0, n + 1):
-        if skew[i] < minimum:
-            minimum = skew[i]
-    for i in range(0, n + 1):
-        if skew[i] == minimum:
-            positions.append(i)
+    positions = [0]
+    skew = 0
+    # number of letters before the current chunk
+    offset = 0
+    for chunk in Chunks:
+        values = itertools.accumulate(map(SkewSteps.__getitem__, chunk.encode('latin-1')), initial=skew)
+        # the first value is Skew[offset], which belongs to the previous chunk
+        next(values)
+        # values[i] is now Skew[offset + i + 1]
+        values = list(values)
+        if not values:
+            continue
+        skew = values[-1]
+        lowest = min(values)
+        if lowest < minimum:
+            minimum = lowest
+            positions = []
+        if lowest == minimum:
+            i = values.index(lowest)
+            while True:
+                positions.append(offset + i + 1)
+                try:
+                    i = values.index(lowest, i + 1)
+                except ValueError:
+                    break
+        offset += len(chunk)
     return positions
 
 
@@ -272,13 +572,7 @@ Hamming Distance Problem:  Compute the Hamming distance between two strings.
   Output: The Hamming distance between these strings.
 """
 
-def HammingDistance(p, q):
-    count = 0
-    n = len(p)
-    for i in range(0, n):
-        if p[i] != q[i]:
-            count += 1
-    return count
+# HammingDistance(p, q) is shared with Motif.py, see MotifCore.py
 
 # p = "CTTGAAGTGGACCTCTAGTTCCTCTACAAAGAACAGGTTGACCTGTCGCGAAG"
 # q = "ATGCCTTACCTAGATGCAATGACGGACGTATTCCTTTTGCCTCAACGGCTCCT"
@@ -292,20 +586,10 @@ Approximate Pattern Matching Problem:  Find all approximate occurrences of a p
 """
 
 def ApproximatePatternMatching(Pattern, Text, d):
-    # create empty list for result
-    positions = []
-    # determine index value we can stop checking for pattern
-    for i in range(0, len(Text)-len(Pattern)+1):
-        # if we find the pattern within the genome, append starting position of
-        # pattern to positions list
-        if HammingDistance(Text[i:i + len(Pattern)], Pattern) <= d:
-            positions.append(i)
-    positions = sorted(positions)
-    output = []
-    for position in positions:
-        output.append(str(position))
-    # print(" ".join(output))
-    return positions
+    # long patterns with few mismatches are found faster from exact seeds
+    if UseSeeds(Pattern, d):
+        return SeededPatternMatching(Pattern, Text, d)
+    return BitPositions(ApproximateMatchBits(Pattern, Text, d))
 
 # Pattern = "CTCGATTCAC"
 # Text = "TCGTATGTGTTTCGTTCGGCTCTTTGACGGGCCGGCGTTGTTTCGACTGCGGGCATTGCTCCGGCTGCGTTGATAGACGGAAGGGACTTACAGGGGACACATCGGAGCGGCCTACAACTTGGAACATAGTGCGGTTTTGGATAGCACCAGGTGAGTTCAGTGGGAGGGGTGGGGTACTTCTCAATATTTTGGGTGCATTGTAGCGTCTTAACAAACGATCGAAGGATTGGGGGGTTATCCTAAGGTCCATCGCACTAAGGAACGAGCAGCTCTTTAACTTAGAAACCAGTTGACGTTGTCGAGAAGGCCTGCCATGCTTGAAAACAGGGGGGTGTCTGGAAAAACTGAGCTACCTCCATCCAGTAACGGATCTGCAGCTATACGAGCAGAAGAGAATCCGGCTGGAATCCCAGTCCCCTAGAGATGCAGTTACTCACTCAGGAGATGTCAAGGCAAGCTGGTTTTATACGCCAATGGTGTCGCTGTAGTACGAGAGGTGTGCTTCTTGGCTTCAGCCACCCTCCAATTCCCTCCAGATAAACGGATCGCCACTTCAAATTGTCACTTACTGGTCCAGTTGACCGGCATGTATTCTAGCATACTTGGAGGAGAGAAGCAATCACCAAGGCACATCTGATCAGCCAGTACGCCGTTAGAGTCCTTAATATCATATAGCTTGGACGCTAGACGTTACGCTAATCCCTCTCACCTTGCTGGGCAGTCTACCTGGCGACTGGAAACGAGGACCCGCCACTCACCGCTCAAATGGTGACTGAAACGGTGGCCAGTCGCAGGTACCCTCTACCCATACTAGCAGCCTAACGGACAACCATTCAAAAATTAGAGACGGGTTAATAGACCAAAGTACTGCGGCACCTAGACCGAATCGCACATAATGTTTGCCCTGTCGATCCCCTGCACTTAACCCATTCTTCCCGCGGGTAGTTTGCGGCTGACTACGCTCGCCGCTAGTTATCTCCCCGGTTGTCCATATTGCGGGGAAGATCCATAGGGCTAGACGCCGCAACTCGTAGGTACTAGAGACTGCAATGCTCGCGCGGTGTCAAGGAGGTTCTTTTTTCGCTCATTGAGCAAGTGGGTGATCGAGATCCAAGTTCGATCCGGGCGCCATTAAGCTTCGGAGCGGGCGAGCTAGCGCTGTCATGGGCGCCAGATGTGGTCTCTGTTCAATCCCAGGTTATGCGATGGTATAACATCTTTTCACCGAGGGGGGTTGCGTCCGGCGTATTGGAATGATGGGGGATTCTAAGGGTATTAGGTGGACAATAACCGGCACGACGCGAACGCCATGTAATAAAAATGGATGACGATCAAGTTAACCCCGGCCAGAGGCGTCAAGTATAGACGAAGACTCATGGCGGTGATCTTTCCAAGTACTCCCAACCTGGCAGTATAAAGACCCCAGTATCGGTATACAACGGCCACGGAACGGCTCTATATATACCTCACTCATTGATGAACCCACAGGACTCTTCCAGTCATGATTCCGACGGCCGCCCGTGCATAGACACGAGCCAAAGCGAGCGATGTTAGCCTGTCGATGCTTCGAACTGATTACGCGCAACCGCCGCGCGGTCTGGATCAGACTTGGCTACCAAGGTAGCTGTTCTCGGTGAACAAGCAAATTGTCAGTGAGTCAACCGCCGATAATTAACGTAAATTCTCCGTTTGCATAGCGCATGGCTCAATCTCCTCTCCACTCTCTGTAGAGGAAACCATGCCCTAATGCGTCCGGGTTAGCTGCTGTGGCCGAATCGGGCTATTGCTAGCCTAACCAGATAAGCACGCTAAACTCGACGTCCCAGGGGGATCACAGTGAGACTCGCGGTCCCATTGTTATGCGCGTAGTGGCGTTTAGGTGTTAATCAAACTTCCAGGGAAGCCGCTATAACAACCCACAGTCACAGCGAATCAATTGAGTTAGGCTCTTGACGACCACAAGACAGGTAGTTATGATTCGCGCGCGGCTCCTGTATCCGTGCAAATGCGAGAAATCAAGATGATCGTTACTGACTGCCGGACCATTGGTACCCCATTCGTCGGTTGAGTGTAGTTCAGGTAAGCGCTGTTGGGGAAAAAACAGTACTCCTGTTGCGAATCCAGGTCTATAGCATCCAGTTTAGACAGAACTAGGGGCCATGTATGCTGGGCAATGGGGCAGTACCGAGGGAGCATAGGAAGAGGCGACTTTGTCCCGCACCAGCGCACAGCATTTATGAACTTTGCAGGCAAGAAGAACACAAACGACACTATCATCTCGTGCTAGGACAAGCGGTACAAATCTGTAAGCGACGCTCTGTCGCATACCCAATGGAAGATCCGGTGGTAGGATAATAGACCGTAGCAAAATGTGAAACAGTGGAACTCCTAACGGCGGAGGCTTAACATACAACCTAGAACGCTGCCCACTCCTGTCGGCTTCTTACATGGGAACAGGGACCTCCTCAACGGCAATGCTTCTCACGGGCGCCCTATACATACAGAGCATTCTCAAAAAGACGTGCTAAGCATGTCGTTGCCCGGCTTATCGCCTATTTATTAAAGCTCTTCACTCACAGGGAAACGGGTTTGCTTGCCCCGCTATAGCGCCTACTGGCCTCCTTCTGCCGTCGCCCGGTGTACACTAGTTCTTGTGGCATCCAGAGTAGGGGTTTGCAGTTATATGCTGCGGCCAGTCTGCGGTCACAGTAAGCCCATAGTCGTGGACAGCCGGAATATTTTCTACCAAAAGTCACTGTCTGAAAAGCTAGCAATAAACTCATTGTGGAGCCTAACTGCCTGCCCCCAGTAAGAGCAGAGGTATTTGTTCTAACAGTTCGAGTAAACTCTTAGTCAGCAAATGATTTGCGTCAAGCGCCCATCATAAGGTTTTAGTGCGAAAGTTTTCCGTGTGACCTTCATATGGAATTTTTGTGAGACCGGGCGGTCGCGAATTGAAGCTCACGGATTCATGTGCTGCGGCACGAGACCCCAGGATCTTGATAACCCTTGTCGCCATTCGAGTTTCCTGTAGTGCGAGGGCATAAAGCTCGCGGAGGCCCAGACGGCGGTCAGATAACTAACGCACCGGATTAGACGAACACCAAAGTACCACGAGCCGCTATCAACGTCGGCTATGTATCCTATTTTACTCTCGCGCGAGGATCTTTTATTAAGCGCAACGCATGGCGCGGTCTGCCAGGCCACTAATCATCAAAGTGACAGCACGGAGCGCTAGTCGATAATACAGCCCACACAGCCAGGGCGCAAAATCGAAGTGAGGACTCGGGTTCGTCACCTGTGTCAACCCATATATGGCTGTTGGCTCTCAACGTACGGTCTTCAAGCGCCGGGACTATAGATCCGTAATGTCTACCTAGTTTCAGTGCAGTTCCGCTGCGTTTACAACTCAGAGGCGGGTCTCCTGGCATTGACTAGCGTAAACGATCAGCTGCAGTTTCCATAGTATTTGTCTCCGCAGTGGAACAAGTAGTTCCCTTAAGACGTACAACAGTCAGCCCCTCGAGATCGCAGCCGGTCGACGGAGACAACTAATGTCCTCAATGTCCTGCGGGGATCCCAGTGCTCCCGTGGTGGGACTCAAGTGGATCCGCGCATACACCCTGTCACACTCTATCGTTTCAAATACGCGCTCGCCTAATTACACGGACCATAACATGTGTGGTATAAGCCGTAAGCAATCATGTGTCCCATGCGAGGGACAGTTTAAGCCACATGATAATCGACGACTCTATCAAAGGAATAGAACACTGATGACATCCTACATGATGACCAAAGGGACTGCACAATGAGCCTATACCAGCCCGACCCCGATCGAAGTACTGGCTAGTCCTCTGCTTGACGATCTGGGCGTTTACGGATCCTAACTTAAATGCCGAGTGTAAAATTTCATAGATGAACGGGTTACTACACCTGCTCATTTTGATAGCTGGTGAGTATCAGGACTCGGAGACGCGTCACCAATTGATATTTCGAGATCCCGTTCGTATAACCGAGGGCGACAACTATGCGCGGGTTGTTAGGGGTTCTGCAATCCGCCGTATCGGTTATCAACTCGGGAGACAGTTCGTTATGCTTGTAAGTTGACGTATTAGACTTCAGCATTTGCACCGTATTGACCACTGTGCTCTTTTCCGTGAGAGACTGCCGAAAACGATCTGGAGCTTTACCCAGTGCCTGGTATTCTAGCCTAAGGTGCTGCTTCGAAACACAGCGTATGACGGGTCTAGTTCCATTGATCCGCAGCCGTCCACCTGTACCATCCTCGGCTCGGCTTTACCGTGCGGTCTTACTGTTTCGGAGCTCATCATAACCTAACTTATCCCTCGAATGACGCGCACTGACATCATATCACAAGGTATCCAGAAATCGGAAACAACCTTGTAACAGCTGACTTCGGTTCCAGCCGACCTTGATCGTAGGACGTGCACCGAAGCGAAGCAACGGTTATAGACCGGACGGTGACGTCACGCGAATACGCACTGACCGCGTTGGGGTACGGATCGCCTGTCCTTTTTAGGGATCCCCGATATTGTCAGGGTGCAGAGGATGAGGTTGCGCTCACCTGTTGACATGTTAGGACTCCTTAAGGCCGCTGGTATATCAACAAGATATGTAGACCCTATTGTCTCCACGCGTCGAAGCCGTTAAATTATTGTGGTCCCGTACGTCCATCTCAAGTAGGGCTGAACGAACGATGTTATGGGTAAGACGCTGGGGTAAAAGTATTGTGCACTGACGTCATATAGGCCGGGCAGTGGCTGCTAGTATGGCATGAATCCTCGCTATTTATGGTCGAAGCCGATGCTAAGGCCACCAATGCTTCCGTGATTATTGGATTTTAGGCGCTTTGTAGTGCCGGCACTAGACTTGGGAAGATGTACATCAAACAATCGCCGTAGATCTTCGGGACATAGCACGTTGCCCTATGTATTCCTTCAGCGTTAAGGGAACCAGACAAAATGCCTACCCATCGACATACATCGTATCGTGACTAACCAAAACGTCGATGTTAAGTCAGACTTGCATTAAACGGCATATGTGCCTCCAAGAAATCTAGAGGCGCATCGACTCGCCATTTGAGGACTCCAGCGCGCGATAGGTGGCCAGCAACGCTAATTGTAGCTCGCCAATGGCGCGAAATGCTGGGGTCCATCTTGTAAATGTGCCACACTGGATAGTACCTAAGGTTTCATAACTCAACCAGGGAAGACCACGGCACCGGCACTCCAAAATCACATATAGGGAGACCTACAATTCTGTGGGCTAATGGTCCTCGTTACTATCAACAGGATACACCGTTATGAGTTCCGCCCGTATCTACGGTGGTCCGGTGTGAACAATCATCCCATCCCGTAGGGTCGGCCAAACGAGTCTCAGACAGGCCCCTGCCGCCGCTGATCTCTGGTCGAGATCTTCTTATCCGATGCAGGTACATAGACCCAACTCTGAACCACGTCGCATTTGTCTTTTGATGTACGGTGATTGGCGGTACACGTATTCACATAAATGATACCGACACTTCTGATACTAGACGCAGCAGGTTTTAACCTGTTCGTCGCTCGTCGAACTTGCAAGCACTTCCCTAAGACGACTCACTATAGCCACCTACGCGTCAATTATGCCCTCCTTCGCGCCTCCGCAATGAGTGTTCTTTTTCGCTCCGAGAAAAGGTCATGATCCAGAGGGGCGGCCCGTCAAGACCCAGCATGGTGGCCCTCGTTGTCGAGACAGGAGTTGGGAATCCCACCCGTATTTCGTTAGGATGATTCCGGCACCTAACTTGAAATCTGACCCATGTGGTACTCATGACCGCCTGCGCCGTATACACACAGCGGGACGTGGATCCAAGGCGTACTGAGATATGCTTAAAGAAGGAATAGTATCGTGGTTGGCATATACGTGATAACTCCAGGGGGCGGCGCAATGATTACGATGACCTAACGTGGTTGGCCATCAATGGTCTGCTAAGATGACCAAGTCGGGAACCTTTTATTTTCTTCGGAAGATCGCAAAGCTTTTTGAACATATACAGTCCATATACCCAAACGACCTCCGGACGGCTTGGAGGTCGAACAGCAGTCCAGATGGAAGTATATGTGAAAAAAGCTCAAAGTTAGCGTTTTGGAACCTGGGTAAGGGCATCTGAGTATGCCTCTGTGCATCTAGCCTGGTTGGGCACAGTGACAGCGAGCTGTACCACGTTCACGGTAGATTGCTCACTCGATTCAGGTGTAATATGGGGCCCCGGCTGCTCCGAAACTTTGACGCGCCCTCGATTGGCAGTCGTTGACGACCGGTGAACTAAATAGTAAATGTACCGATCGACCTAGCTCAAGCTGAGCGGCATTGAGAATCAACTGTCAATCTCCACCGTCAGAGTATTCGCAGGATTACATGACCGTAGCTGGCTTTGCAACGCGCTAGTGTGCCTTTAGCAAGCCTAGTTGTTTTTGGACCGTCGCCCTCGGCATCTGGTGCTCTTGTAGAGACTCGACTCATCACGGACCAAATCCAAAGCTGTATGTACTTTTGGCGAGTGTTCCGCAGCACACGACATCGTAAGGTAATCCCTCACATGGATCGGGCGGAAGTATCACCCACGACCTGCTTCACACTGTGAGTACTGGTACTTCTCTTTGCAGATATAAAGAGTATGACTGACTCAGCTCACGTCTTCAGTAGGATCACGCCAAGACTTGGGTGAGGATATATCACACGATGAACCAATTCACTCAGTCAGGGCGAATTCAGCGAAGGATATAAATATTGGCTATTCTCTACAGCCGCGAATGTGCGCGCGGGCCAGCTGTACTATTCCTGAGGTCCAACAAGATCTACGGTCTCCCGTCCGTCTGGTGAATACCAGACGTGATCGCCGACCACGTTATGTCTGCAAGAATTAAAGACCCTTCTATCATCCTTATCTGTGCACTCATAGACACTGCCCAAGTGCTTATGCGTTGGATCTTTGCAGTCAGTCAATAATCAATTTAAAGGCGGCTGGTGGATAACACGTAGCTTCCCTCCCGATGAGAATGTTCAATACCGTCCGCTTAATTCATGGTATATTGTAGCCCGGTTATTGTCAGACACAGCATGCTAAATCACGACCTTTTCAACGATGACTCACATACCAAACTCTAAAGCTCGGTACCGGGCACCGCAAGAGGGGTGGGTGTCATCAAGACGATCATCAGAGTCATGCACAGGGCAATGCACCATGTCCTTTGCTAAGTCAGTGGCGGGTCATCACATCCTGCGTGCCAATGGCCACAATTTCCCCACGTCTCACTTAGAAATGCCTGTTAGTAGCGGCGTTAGAGCCAGAACCGAACGTAGTTACAGAACCAAAAAATGTGGACGTTAGCATTAATTACCTAATACCGGTGCTTGACGTGTATGATCCTACGTTCCTACACTGGAAAATACTGCGCGTATAGGAGCTTTAATGTAATCGAGGTCACGTCGGACTGGAGCTGTCACTCGAGGCGTCTACAAATTTACTAGAGTAAGTCTACGTCCCCTAGCTCCGATACCAAAAAAAGATGTCGTGACACCAGCCACGGGAGGAGGCGTGGTAGTACACTTGAAGTAGGTATACGCCCGCAACGCCTCAGAGGAAGGTAGCCAATGACACGAATGAAGGTGCTGGGACTGTAAACGTGTCGAGAGCCATCATAGTTTCTTTTGATATACACGGGGTGGCCGGGTGATTAATCTTGGATTAACCAGTTAACGTATCCGAAACCGATCTGGTGGGTCCTATTCTAAGACTGGCCCTAACCTTACAGCTACTCCAGGATCCAGGCGGTTCGAAGTAAGTCCAAACTCGTTATAGTCTGTTTGCCGAGACTTCGCCTCAGAGAGGCCATTGATTGAAATGTTACACCCTGACATAAACATGCATCCACGGAATAGGGGCGCAGTTCGTCAAGCCCCGGATCCGCGACGAGACCGGCAGTCCAGTATCGTCACCCTAGGATAATCCCGACGGGAACGGGAAGGCCGAACTAAGACTGGAGGATCCTTGACGGATTCAACTGCTGTCGAATGAGCTTTCGGATGCCAATTGCTACCCCAGCCAGGACCCATTTATGAAGGGGCGTAGCGAGACGCGATGGGTGTGGTATCATTTTCTGAATGGTAAGCATGACGGCCGCACAAGTAATCGCGCGTGTTCTGGTCTAACGGCGCTCGTCAATTCTTCTCCTCTCGTGAGGGTATTTTATCAATCCATCAACACATGCACCATTCTTGGACGCGTCACGTGGGCTTTAAATCCAACGTCCGCGAACCACCTCCTGTACCGAAGGATAACTCTCCAATAAAGTGCTTCGCTAGGTTCCGTCCAGTTAGCTTTACGGAGATTATTAATTTCGGAGTGGTATCCACCAGGCGCTTGTACGTCTCCACTCAAGCTCTCAGGTGCGAACCTGAGACGTAGTTTAGATAGCGGACCTATTATTCATCGGGTGGGTATCACTAATTCGCGGTTCCTGTTGATCTCCTAACCGTTTTGAATATTCAAGCCCACTATAGGCTAGCGTACGATGTCAGGCAATAGCAGGCTAGGAAAGTTCTCATCAGTGTTTACTAGGAGACATACTTGCTTTATTACCTGGCTAACGAATCTGCCGGTCAGACGTACAACTCCACATGTGCAATCTACACCAGTATTGATACTTTCCGCGCCCGTCCATGCGGGCCCCAGTAACTCATCGGGAATCATCTTAGTAATGTGCCGATTATCCCGAAACGGAGGTGGTTTGGTATGAGGTTGCACCGTTGCAGCGAGTCGAATCTCTAAGGTTAGGCAAAAGCGTGGTCTGTCAATAGTCAGTTACATAAGCGCGACTCCCATGTGTCGGTGGAACCCTGGCAACTTTATCTACGAAACCCGCTTCCGACTGGTCACAGGTTTGTGTTACTGCATTGGGGAACCACCAGCCAGGCTATCCCATCGAACCTGATAACTTCTACTGCCGAACATGGTTTATGGTTCTAGAGGCGAGGACGTACAGCCGTAGAAAATGAAGCAGGCCTACTTCGGCCCTATATAACACCCGAGTCGGATAGCTTCACAGCGACTGCCGTCGCAACATTCGCGAGCCGCGTGTATAGTGACAATACCAGCATAAGTCGGCTATCCACTTTTCTACAGTTGCGAAGGCTAGGTCCCCTAGCATTTCTAAGATCAACATATCGGGTGAGGGATACTACGACTTAGGGTGTCGTGTCGCAGAATGCCTCTAGATGGATGTTGCGATTCGACAAATCCCACAGGGTCGGCATAAGACATTATGTCACAATTCGCCGACCGCAACCGTGTAACTTACTGGGGTTCTGCTGCAACTCGTTTCTACGAGTGTATCGAGTCTGCACGATCTCGTCTATGCTGATCTGAATGTGCGGTGACAACCGACTCGTGGTTGTTCAGAGGGGAGCGCCCCAAATCTAGGATTGCACCTGATGTGACTGTAGTTTGCGGCTATGGCCACATTTGGTTGGGCTCCGCGAGGTGTTCAGTACCGGCACTCGGCTCGGGGCTAGGAGGCGTGTCTGGGGGGGCGGATCTTTCTGTTTTGCCCTGAACACAGAGAGAGCGGAATAGTGATAGTCCGTGCGAATTGCATGGGGGGCAATTCAAGTGTAAAACGATCTTCGGCACTTAGCCGTGGGATTGAAAGGTTGACGTGTCTTGGGGCACTTGCCAACTATGGCGCTTTGTTACTGTGGACTGTTTGAGAGACTAGAGGGTTCGATACGTATCTCGGCGTTTTAACGCTGAGCAGCAGTATTGACTTCCCGACAGGGACCTATTCGTGATACAGGGCGGGCTTTATTAAATAGCACCCTTTTCTGTACGGTCTAAACGGTTCCTGACAGCCTACCCACTACTTTATGAAGCCCACCCTAGCTATACAGGCTGTATTACGGAGTGAAGATTTTCCCTAAGGATCAGTTCAGCTAACTCAGCTCCCCGGGGGCGGATCTGTTCTGCTCTGGATTCCTGTTAATTTTGGGCTACACCACCATACGATATGTGGAAGAGATTACACAAGTCAGGACGTAGAGGTTAAATTATGAAAACCTCATAGGACATGAGCTACCAGCGGACCCGTAGGGCAGGACAATACCTACAGTAGCGCAGGTAACTAGGGTTCAAGCATAATCGGGATATTAACCCAGTAAACAGGTTTTTAACCCATGTTATATCCAGCTTATAATACCGGTCACGTCTAGTGCCGCCGAGAATAAAGCCAACAACATGATGTCCTCACTAATATTACTTGATGCGGCGCGGGAGAGTCTCGCACCTAATCGACCGGGTCTTTAGCAAGATTGAAAGATAAGAAAGCCCACACTGAATGCCGCAAGCAACTCGTTTGCCGGTTTAGGCAGTTTATCAAACGGGGTAGCCTTATGTGGCCCCTCGACGGACACGGGAAAGTGAGCATTGCTAAACATACTCGGGCCGCTTATATAACTGCTTCAGTGTAGGTAGATTCCAACATGTTTTCTACCCGCCCACAATTCAATTGCCATAAATGCGCACAAAACCTAGAGAGCCGACTCGGTGCCAGCGCGAACTGCGTTTCGCGACTACGCGATCGGAATGCGCAATCACCGCCGTAGACGGCCTTCCCCTCCTTTCCAAGCAGGGTCACATGCTCGCACGAGTCATACTTTTCGCGACTCTTGCCAACTAGGTGTAAATGCAATACTTACGGCTAGTCGAACCTAAGTACACAAACAATTTTCGCCAGCCGCTGGCCTGCTTCGCCAACTGCTGCGAGACAGCTTTCCAGGGAGCTCAAATGCATAGTCCTACAAGGAGTCCCATAACAGTATAGCAGTCAGCACTCCCCGTCCGAAGAACTCATCCAATTTGCAGACGAGCGCGAAATATACGGGCCATGATTCCTGTGGGAGCTGGATCGAAGCGTTGAAGTCCTGGGCTTAACCTATAGCGTCTGCGTCCCCAGGTGGGCCGCTTGAAGATTGTGTACACCTTCCAGACGACGACGTTAAGGTGGTCTTTTTCCACCACAATGAGTTGGAATGCATAGGTACCAAGCTACTAAGAAGTCGGATCACGCTGTCCTATACCATTCACTGGTTAAAGTTAGGCTAGTTTGTGAACGACTCAGATCTCCGAGGAAGTGCCACACGCGTGCCAATTCTTTAATCTTGAGTAAGATCTAATTTCGAGACAAGGGAGGTCCCGGATTCTCTTCTGAGAAGTATATTGTACTAGCTTAGTACCGCGCATGACCCAGATAGGAAGGCAACGCAGGATACCCGTGACCGAGATGTCTGTATAGAGAACGGGTCCAACGTGGTATGACAATGTCTCTGGGGATAGTGATAATCGGCGTATCCTCTGCAGCGCCGTGACCCCCGTCACTTTAGGAATCGTCTTGCAATTTCTACTTCACGCGGGTTTTGCCAGAGCAAAAGGAACGAATATATTGAGCTTCCATAATATCATTCTAACTGTATGCTAGCTCGTCCTGGATAGGAAACGAGAGTTAACCTAATTTTGCGCGTCCAGGTCATCTTAAGCGTTCCTGCTAGACGAAGATGGAATGTCGTAAGCGAGTGGCGTCGCAGCGACGAGGTTGCAACTAGGAGGGTAATGTGGGGAATACAAAGGAATCGACCTCTAGCTCGTTCTAGGGCCACTCACTACTGGAGGGGGCAATTAGGGCATCTCCAATTGTGCTATCGGAGAGGGGCATGTAGAAAGGAGTAAGTGGCCAGCGCAGATACGATGGTACCACTCGACAGTTCATCTAATATGCGGTAGACACGCTACATAAAATGTGGTCCGCTTCGCTAATCGCACCCCAAACGGATCGAGCAGCCCCGTAAGAGGTGAGTACAGGTCACATGAATAGATCGTAGACTCTATCGATTGTACCTTATTGCCTAGTACCCGCTTCCTAGAGGTTCGTGCCAAAATCTTGCGTACTGAGAACCGTGGTCTCATGTAAGTCTTACTTCCGATCAGTAGTTGCGTCCTGCCTTCACTAAAAACGGTATTCGTCAAGTAGCGTACAGCGTGCTGGTGAAAGTGACAGGTTCCATAACCGTCGAGATTCTTTTGCAGAAGTACCGGTTTTAATGGTGGCATGGAAACTTCTCATGTGGAGTTCAACTACATATTATCCCAGAGCTTACTCCAACGACATATCGCCTATCGGCTGGGTTGCATGCTAAGCACGCAGCTACTCATTGAAACCTCCATTCAGTTCGCAGGGTGATGGGATCTAGTACAGGCGTCCTACGCTGTGCTACCCTGTACTCTGCGTAGAACTCCAGACCCAGCTCGCCAGTTGTCCCGAGAAATTAGTCCCAGTAGGACTTACCCCTTGATAACTAGTGTTACGGTTGCGAGAGGTCAATTACACTTTGCAACTGAGCTTACGACGTATCCCACTATCTGTATGCCTCGGCAATCCTAGTGTTCGACCACTCTGCAAAAAACTTGCAAACACGAGCTCTGTGTGGGGCGACAAAATGATCAAAAGCAGTTCCTATTTTGTAGGCTGCATCAATATCTAAATAATCTGACCGCTGATAACTATGTAAGTTAATAGTCCACTATCGTTATCTCCTCCTCAGAATCGCAAGACCGCCCGCGCTGCGTCTGAAGAACGTTCGGCTACAACGCATGCTCTCAACTACTCTGTATGCCTCTTTCTTAGATCTGAGCGGCGTCGGGCACCCGGGTCAAGACTATACAACGCCGCAGCTCCCGTTACAATCTTCTTATTACCAGTGTAGGGTAGGGAACGCCGATGCATAACGCAAGGCTGTGCGTCGTGAGCTCCATCCAAGTTTGAGCACTCGAACCCGCGTGGATGCCGTCCCTTAGGCCGTATGTCTCAACAAGATGATTTTCGACAGAACTTGTGATGATGCAAACCAAATGTAAGCCGACACCGATAAAGTACAGTTTGAGGTGCTGTGTTGATGCCATCGTGTCTTTCCGCCCATCGTCACAAAAGGCGTTAAGTGGCCCCGTTAGTGGGGAGCCACCTGCATGTATGACTTCTCTTGAGGGGTATCTTCCTCTTCTAAGGGGAGCTCTATGTCCCCGGGATGTGCACCCAACCAGGCAATCACGTTTCACTCCTCTTCCAAGGCTTAGCCTGAGTACCACATGTTCTTCTCTACAACACCATCTGGCCGCAGATGTGATCATAGTTAGGAAGCCAAAAATGCGCCTATCGTGGTATGGCTCAGTTATGCGTACGCAATGTCCACGAATGCTAGAGGGTTCAGATCTTTTTGGAGCTGTGTGATTGTGAGCAATAGCTCGCTCTGTGTGCCCCTCCACGGATGGCCCCTGCATCGCCATACCTTTTTTTATGTTCACAACATCCCACTTGAAGGCTCAAAAGGCTTAAAACACATGGAATACGTAGATTGTTCCAGGGCGCGCGTTGTAAGCCTCACAGAGTTACATAACAGAGGTCGGGTCAGCCGGGAAGTTAGAGGGAGGAGATCCGCCGAAAAACCGATATCCCCAGAGGAGCCCCTCGGAGGCCTCGTATTTGGTCGGATATTAGGGCTGTGTGGTTATAAACGGCAAGCGGAGGTGATTCGCGACCAACAGCATAAGACACCGATGCTGAAGACCACAACGCCCTTTAGATTTATTATGCGCCGTCCAGGCGTGTTTCGGAAGCTATGCTCCCCTAACAACGCCTCTTACTCTGTTAAACACCAGGGTTAGTGTGCGTGAAAGGTCGCGGCCGACGCCCCGCTAAGTTTGAGATCCGCAGATACAGCTCAGTCAGACTAAGCGATTGCAAATGTCTGGCTACTGCTCTCCCACTTGTATTCTACCCCAGCTGACGTGGGGTTCATATTACACATAGGGTCTATAGACCACTCTATGGTGTTGTTCCAAGGAAAGATTCAGAAGTGCGCTAAGGAACTGGAGACGTTAACCTTCTTTGCTCAGCTAAGCTATTTATTCGCCGATGTGACGTACTCGTGTCCAGCCTTCGCTTCCCAAATCTACCTCTCCAGGGAAACCTACAATTACGGTCACCAGCCGTCTCTCGCGCACTCCCGTCCCAACACTAGAGAACCGGTCCTAGGCGTGTTTTTCCACCGCGGACTTTCGCCGCGTAGACATTTGTTTGGCGCCTCCAACCTCTCCCGTCAGACTACTTGAGAATACATGGGAAGAGGACCTGTCGGACTTCGCGCGCCGGTTGAACCAGCCTACCACTATATTTCATCAACACCCGAGGATGGCTAAAAAGCAGCCCATGAACAAAGCCCGGTCGTAACGGATAGAAGTATCGCACATTGACCCGTCAGTGGATGTCGTTGTCTCGAATATCATATTTGGCAAAGAGTTTAATTTTATGGACATTGCAACGCGTATCGTTACTGGAAGGGACTGGGGAATCAATAGGCTGTCCTAACTACATAAATACACAGGTAGTAGTGAATACCAAGTCTATTCGGTTCGCATTTGATCCGCCCGAACGAGACAATGGGCGATGCGCGGGAATATCTATATAAACCTTTAGGTGAGGCATCAGTAGATATCGCCCTTGCACCACTTTATCTGCCCCTGATTATTGGGGCGTAAGGTTGGCAAACTCTGGCTCCCACAGTCTGCCGAAGATCCAGATTATTTTTTGTCATGACAGATCTGTGATTTCCCCTAAGGTCAACATCGTTGCGAACAGTATTTCCCTCGGACGATGATAAGGGCAGTGAGCAGAACAATTAACGTAGAAGTTATGCACGGAGTCCAGATTCATATTCATCTCTGCTTAATCTGCCAGCGAGTTACTGTAAAGCCGTTGAACGTGCAGCCTGCGGTTCCACGCTCCCTCCACGGCAGTATATGGGCTAATATGACTTAGGATAGCCAGTCTTCCTACCCCAGTTTTCCTTCGAAGCTTGCCGGACGATCATCCCAGCAGCAGGATAAATATAACGCCAACCAAAGTGGGGACAGTCTAAGATTATGCACGCTAGCGGAGCTCTCCCAGAAAAATGGGAGGATATTGCAGTGTTACTTGCTTCCTTCACAACCTCTATGGAAATGCCATAGATCCCTACTCGGCTTTCTTCGGTTTTTGATGCCATACAAGGGCTTGGATACTACGGGAGTTGCCCGGATCCGCTTGCTACATCCCGCAACACTAGCGACCTAACTCCTGGGCTCCCTCACTTTTATTAACACCCAATGTGGTGGCCAGTCTGGCGCAACGTAGCGGAGGAGGAAGCAGTCTTTGGTCGATGCGGACTCCTGGGGGACTCCTAGGTAATAATTGGACTGGTAAATGTCTGGTGGGTTACCTCGGGCACGATGGCCTGCTAGCTAGGGGGCATTGCTACAGCTGCCCGGGCTACACGATGTGAAAGAGCTAACACGCAAGAATTTTCACTGGGGATATACTAGAATGAGCACTCAGCTTCTGCTTGTTTTGGTGGTCTACACTATGACAGCCCCGACGTACGGCGCTGACGCATGTTTCACGCTTAAACGTGCCCACTGAATGGGGCCGATATCGGGGCCCGTGAGAAAAGCATGAAAAACAGTCAACGTATGTAGCAGGGCTGCTAGCCGTTGATAGTCCGTATGAAATGCACGACGTTGCCGGGTCTGCCGCACATGGAGAGACTATGGGAAATGGACAGCAATCGATCGGGGCTTTAAAAAATCTACAGTACCGGCGAATAAATATGTGATATCGCGAATAGGGGAATGGAATTGTGGGTGTCCGTGGACCGGCCTAACCAACTTACTTGTACCAAGGCAGAGACCGATCAAAGGGAAAACCCTACGACAGACCTACACCCGTGATTGCGCGCAATGTGCAGATAAGGCTGCTACCCAGGTTGAAGGTATCATGCGACGACCGATTGGACACTGTACTCACTTTAGGGACATGCCTGGCAGACAATACAGAAGGACGAGGTGTCGCAACGGTCCCTTGTAGTTCCTAACTCGATTCAC"
@@ -314,7 +598,10 @@ def ApproximatePatternMatching(Pattern, Text, d):
 
 
 def ApproximatePatternCount(Pattern, Text, d):
-    count = len(ApproximatePatternMatching(Pattern, Text, d))
+    if UseSeeds(Pattern, d):
+        return len(SeededPatternMatching(Pattern, Text, d))
+    # count-only mode: a popcount of the match bits, no list of positions is built
+    count = bin(ApproximateMatchBits(Pattern, Text, d)).count('1')
     return count
 
 # Pattern = "AA"
@@ -322,20 +609,142 @@ def ApproximatePatternCount(Pattern, Text, d):
 # d = 1
 # print(ApproximatePatternCount(Pattern, Text, d))
 
-def ApproximatePatternMatching(Pattern, Text, d):
-    # create empty list for result
+"""
+Calling HammingDistance at every position of a genome compares one pair of letters
+per Python step. Instead, we compare one letter of Pattern against every position of
+Text at once, using Python integers as (arbitrarily long) bit vectors:
+
+  1. For each letter in Pattern, MatchBits builds an integer whose bit i is set
+     when Text[i] is that letter.
+  2. For position j of Pattern, shifting that integer right by j lines Text[i+j] up
+     with bit i, so NOT of it marks every window i that has a mismatch at j.
+  3. The number of mismatches of every window is kept bit-sliced: plane b holds bit b
+     of each window's count, and adding a mismatch vector to the counts is a ripple
+     carry (XOR for the sum, AND for the carry) across the planes.
+  4. Comparing the bit-sliced counts against d from the highest plane down marks
+     every window with at most d mismatches.
+
+Each step works on whole integers, so the cost is O(|Pattern| · log |Pattern|)
+operations on |Text|-bit integers, each done 64 bits at a time inside Python.
+
+When Pattern is long compared to d, splitting it into d+1 pieces is faster: by the
+pigeonhole principle an occurrence with at most d mismatches matches at least one
+piece exactly, so we only need to look for the pieces with str.find (or a
+GenomeIndex) and check the few candidate windows around them.
+"""
+# shortest piece for which pigeonhole seeding beats the bit-parallel count
+SeedLength = 8
+
+"""
+input:  Text- DNA string and a single Letter
+output: integer whose bit i is set when Text[i] == Letter
+        ex: MatchBits("GATTACA", "A") == 0b1010010
+"""
+def MatchBits(Text, Letter):
+    # translate Letter into '1' and everything else into '0'
+    table = bytearray(b'0' * 256)
+    table[ord(Letter)] = ord('1')
+    # reversed so that Text[0] ends up as the lowest bit
+    bits = Text.encode('latin-1').translate(table)[::-1]
+    return int(bits, 2) if bits else 0
+
+"""
+input:  Bits- integer bit vector
+output: sorted list of the positions of the set bits
+"""
+def BitPositions(Bits):
     positions = []
-    # determine index value we can stop checking for pattern
-    for i in range(0, len(Text)-len(Pattern)+1):
-        # if we find the pattern within the genome, append starting position of
-        # pattern to positions list
-        if HammingDistance(Text[i:i + len(Pattern)], Pattern) <= d:
-            positions.append(i)
-    positions = sorted(positions)
-    output = []
-    for position in positions:
-        output.append(str(position))
-    # print(" ".join(output))
+    bits = bin(Bits)[:1:-1]
+    i = bits.find('1')
+    while i != -1:
+        positions.append(i)
+        i = bits.find('1', i + 1)
+    return positions
+
+"""
+input:  Strings Pattern and Text along with an integer d
+output: integer whose bit i is set when HammingDistance(Text[i:i+len(Pattern)], Pattern) <= d
+"""
+def ApproximateMatchBits(Pattern, Text, d):
+    m = len(Pattern)
+    positions = len(Text) - m + 1
+    if positions <= 0:
+        return 0
+    # one bit for every window that fits in Text
+    windows = (1 << positions) - 1
+    if d >= m:
+        return windows
+    Text = str(Text)
+    letters = {}
+    # planes[b] holds bit b of the mismatch count of every window
+    planes = [0] * m.bit_length()
+    for j, Letter in enumerate(Pattern):
+        if Letter not in letters:
+            letters[Letter] = MatchBits(Text, Letter)
+        carry = ~(letters[Letter] >> j) & windows
+        for b in range(len(planes)):
+            if not carry:
+                break
+            planes[b], carry = planes[b] ^ carry, planes[b] & carry
+    # windows whose count is greater than d, found from the highest plane down
+    greater = 0
+    equal = windows
+    for b in reversed(range(len(planes))):
+        if (d >> b) & 1:
+            equal &= planes[b]
+        else:
+            greater |= equal & planes[b]
+            equal &= ~planes[b]
+    return windows & ~greater
+
+"""
+input:  Pattern and the number of mismatches d
+output: True when the d+1 pieces of Pattern are long enough for seeding to pay off
+"""
+def UseSeeds(Pattern, d):
+    return d < len(Pattern) and len(Pattern) // (d + 1) >= SeedLength
+
+"""
+Pigeonhole seeding: every exact hit of one of the d+1 pieces of Pattern gives a
+candidate window, which is then checked with HammingDistance.
+
+output: sorted list of starting positions, like ApproximatePatternMatching
+"""
+def SeededPatternMatching(Pattern, Text, d):
+    m = len(Pattern)
+    n = len(Text)
+    size = m // (d + 1)
+    candidates = set()
+    for piece in range(d + 1):
+        offset = piece * size
+        # the last piece takes whatever is left over
+        seed = Pattern[offset:offset+size] if piece < d else Pattern[offset:]
+        if IsGenomeIndex(Text) or IsPackedGenome(Text):
+            hits = Text.Locate(seed) if IsGenomeIndex(Text) else Text.Find(seed)
+        else:
+            hits = StringFind(Text, seed)
+        for hit in hits:
+            start = hit - offset
+            if 0 <= start <= n - m:
+                candidates.add(start)
+    if IsGenomeIndex(Text):
+        Text = Text.Genome
+    positions = []
+    for start in sorted(candidates):
+        if HammingDistance(Text[start:start+m], Pattern) <= d:
+            positions.append(start)
+    return positions
+
+"""
+input:  Text and Pattern strings
+output: list of all (possibly overlapping) starting positions of Pattern, using str.find
+"""
+def StringFind(Text, Pattern):
+    positions = []
+    i = Text.find(Pattern)
+    while i != -1:
+        positions.append(i)
+        i = Text.find(Pattern, i + 1)
     return positions
 
 """
@@ -361,28 +770,112 @@ def Neighbors(Pattern, d):
 # d = 3
 # print(len(neighbors(pattern, d)))
 
+"""
+Neighbors builds every d-neighbor of every k-mer of Text as a new string, sorted,
+through a recursion that calls HammingDistance on each suffix. Working on the base 4
+index of a k-mer instead (see PatternToIndex in Clump.py), each letter is 2 bits,
+and XOR-ing bits 2p and 2p+1 with 1, 2 or 3 turns the letter at position p into
+each of the three other letters. So every k-mer within Hamming distance d of a
+k-mer is its index XOR one of a fixed list of masks, one mask per choice of at most
+d positions and a substitution (1, 2 or 3) at each of them:
+
+    sum over i <= d of C(k, i) · 3^i masks     (6571 for k = 12, d = 3)
+
+The masks only depend on k and d, so they are computed once, and the neighbors of a
+k-mer are just map(index.__xor__, masks), which Counter.update counts in C.
+
+input:  integers k and d
+output: list of XOR masks, starting with 0 (the k-mer itself)
+        ex: SubstitutionMasks(1, 1)
+            [0, 1, 2, 3]
+"""
+def SubstitutionMasks(k, d):
+    masks = []
+    for size in range(0, min(d, k) + 1):
+        for positions in itertools.combinations(range(k), size):
+            for values in itertools.product((1, 2, 3), repeat=size):
+                mask = 0
+                for position, value in zip(positions, values):
+                    mask |= value << (2 * position)
+                masks.append(mask)
+    return masks
+
+"""
+Counts, for every k-mer Pattern, how many k-mers of Text are within d mismatches of
+it (the number of approximate occurrences of Pattern in Text). When
+ReverseComplements is True, approximate occurrences of the reverse complement of
+Pattern are added as well (see FrequentWordsWithMismatchesAndReverseComplements).
+
+With Canonical=True only canonical indices are kept (see RollingCanonicalIndex in
+Clump.py): every neighbor is folded with its reverse complement as it is counted,
+so the Counter holds about half as many keys. Since ReverseComplement(kmer XOR mask)
+is ReverseComplement(kmer) XOR the mask reversed letter by letter, the reverse
+complement of each neighbor is rolled along Text with the k-mer instead of being
+computed. The count of a canonical Pattern is then its approximate occurrences plus
+those of its reverse complement, except for palindromes (their own reverse
+complement), which are only counted once unless ReverseComplements is True too.
+
+input:  Text- DNA string, integers k and d
+output: Counter mapping base 4 index -> count, for every index with a nonzero count
+"""
+def MismatchCounts(Text, k, d, ReverseComplements=False, Canonical=False):
+    masks = SubstitutionMasks(k, d)
+    counts = collections.Counter()
+    if Canonical:
+        # reversing a mask is taking the reverse complement and undoing the complement
+        reversed_masks = [ReverseComplementIndex(mask, k) ^ (4**k - 1) for mask in masks]
+        for index, reverse in RollingIndexPairs(Text, k):
+            counts.update(map(min, map(index.__xor__, masks), map(reverse.__xor__, reversed_masks)))
+        if ReverseComplements:
+            # every other Pattern already counts both strands
+            for index in counts:
+                if ReverseComplementIndex(index, k) == index:
+                    counts[index] *= 2
+        return counts
+    for index in RollingPatternToIndex(Text, k):
+        counts.update(map(index.__xor__, masks))
+        if ReverseComplements:
+            # Pattern is within d of ReverseComplement(kmer) exactly when
+            # ReverseComplement(Pattern) is within d of kmer
+            counts.update(map(ReverseComplementIndex(index, k).__xor__, masks))
+    return counts
+
 """
 Frequent Words with Mismatches Problem: Find the most frequent k-mers with mismatches in a string.
      Input: A string Text as well as integers k and d. (You may assume k ≤ 12 and d ≤ 3.)
      Output: All most frequent k-mers with up to d mismatches in Text.
+
+The k-mers are listed in the order in which they first appear in the d-neighborhood
+of a k-mer of Text, and alphabetically among k-mers first reached at the same
+position (the order in which Neighbors would have produced them).
+
+With Canonical=True a k-mer and its reverse complement are counted together (see
+MismatchCounts) and only the alphabetically first of the two is listed.
 """
-def FrequentWordsWithMismatches(Text, k, d):
+def FrequentWordsWithMismatches(Text, k, d, Canonical=False):
     most_freq_kmers = []
-    counts = {}
-    for i in range(0, len(Text) - k + 1):
-        neighborhood = Neighbors(Text[i: i + k], d)
-        for kmer in neighborhood:
-            if kmer not in counts:
-                counts[kmer] = 1
-            else:
-                counts[kmer] += 1
-    best_count = 0
-    for kmer in counts:
-        if counts[kmer] > best_count:
-            most_freq_kmers = [kmer]
-            best_count = counts[kmer]
-        elif counts[kmer] == best_count:
-            most_freq_kmers.append(kmer)
+    counts = MismatchCounts(Text, k, d, Canonical=Canonical)
+    if counts:
+        best_count = max(counts.values())
+        remaining = set()
+        for index in counts:
+            if counts[index] == best_count:
+                remaining.add(index)
+        masks = SubstitutionMasks(k, d)
+        if Canonical:
+            reversed_masks = [ReverseComplementIndex(mask, k) ^ (4**k - 1) for mask in masks]
+            neighborhoods = (map(min, map(index.__xor__, masks), map(reverse.__xor__, reversed_masks))
+                             for index, reverse in RollingIndexPairs(Text, k))
+        else:
+            neighborhoods = (map(index.__xor__, masks) for index in RollingPatternToIndex(Text, k))
+        # walk Text again until every most frequent k-mer has been reached
+        for neighborhood in neighborhoods:
+            reached = remaining.intersection(neighborhood)
+            for kmer in sorted(reached):
+                most_freq_kmers.append(IndexToPattern(kmer, k))
+            remaining -= reached
+            if not remaining:
+                break
     print(" ".join(most_freq_kmers))
     return most_freq_kmers
 
@@ -390,3 +883,31 @@ def FrequentWordsWithMismatches(Text, k, d):
 # k = 7
 # d = 3
 # FrequentWordsWithMismatches(Text, k, d)
+
+"""
+DnaA binds to both strands, so a k-mer Pattern and its reverse complement count as
+the same DnaA box.
+
+Frequent Words with Mismatches and Reverse Complements Problem: Find the most frequent
+k-mers (with mismatches and reverse complements) in a string.
+     Input: A DNA string Text as well as integers k and d.
+     Output: All k-mers Pattern maximizing the sum Count_d(Text, Pattern) +
+     Count_d(Text, ReverseComplement(Pattern)) over all possible k-mers, in
+     alphabetical order.
+
+The sum is the same for Pattern and its reverse complement, so it is only counted
+for canonical k-mers and each best one is listed together with its reverse complement.
+"""
+def FrequentWordsWithMismatchesAndReverseComplements(Text, k, d):
+    best = set()
+    counts = MismatchCounts(Text, k, d, ReverseComplements=True, Canonical=True)
+    if counts:
+        best_count = max(counts.values())
+        for index in counts:
+            if counts[index] == best_count:
+                best.add(index)
+                best.add(ReverseComplementIndex(index, k))
+    return [IndexToPattern(index, k) for index in sorted(best)]
+
+# Text = "ACGTTGCATGTCGCATGATGCATGAGAGCT"
+# print(FrequentWordsWithMismatchesAndReverseComplements(Text, 4, 1))
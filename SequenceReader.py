@@ -0,0 +1,177 @@
+import gzip
+import itertools
+"""
+Streaming readers for the FASTA and FASTQ files used with the motif and replication
+functions, such as upstream25.txt through upstream1000.txt:
+
+>Rv1733c
+TAGGAGCCACGAGCAATTCACAGCG
+>Rv1737c
+GAGTCCGAGACCCCGGATCGTGTCG
+
+Records are read one line at a time and handed out as soon as they are complete,
+so only the current record is ever held in memory, never the whole file. A
+sequence may be split over many lines. Files compressed with gzip are recognized
+from their first two bytes and decompressed on the fly.
+"""
+
+"""
+input:  Path- path to a plain or gzip-compressed text file
+output: file object opened for reading text
+"""
+def OpenSequenceFile(Path):
+    with open(Path, 'rb') as handle:
+        magic = handle.read(2)
+    # every gzip file starts with the bytes 1f 8b
+    if magic == b'\x1f\x8b':
+        return gzip.open(Path, 'rt')
+    return open(Path)
+
+"""
+input:  Path- path to a FASTA file
+output: generator yielding (name, sequence) for each record, where name is the
+        header line without the '>'
+        ex: ('Rv1733c', 'TAGGAGCCACGAGCAATTCACAGCG')
+"""
+def ReadFasta(Path):
+    with OpenSequenceFile(Path) as handle:
+        name = None
+        lines = []
+        for line in handle:
+            line = line.strip()
+            if line.startswith('>'):
+                if name is not None:
+                    yield name, ''.join(lines)
+                name = line[1:]
+                lines = []
+            elif line and name is not None:
+                lines.append(line)
+        if name is not None:
+            yield name, ''.join(lines)
+
+"""
+A FASTQ record is four lines: '@' followed by the name, the sequence, a '+' line,
+and the quality string (one character per base).
+
+input:  Path- path to a FASTQ file
+output: generator yielding (name, sequence, quality) for each record
+        raises ValueError for a record that is cut short, has no '+' line, or whose
+        quality string is not as long as its sequence
+"""
+def ReadFastq(Path):
+    with OpenSequenceFile(Path) as handle:
+        for header in handle:
+            header = header.strip()
+            if not header:
+                continue
+            if not header.startswith('@'):
+                raise ValueError("expected a FASTQ header starting with '@', got " + repr(header))
+            name = header[1:]
+            try:
+                sequence = next(handle).strip()
+                separator = next(handle).strip()
+                quality = next(handle).strip()
+            except StopIteration:
+                raise ValueError("incomplete FASTQ record " + repr(name)) from None
+            if not separator.startswith('+'):
+                raise ValueError("expected a '+' line in FASTQ record " + repr(name) + ", got " + repr(separator))
+            if len(quality) != len(sequence):
+                raise ValueError("FASTQ record " + repr(name) + " has " + str(len(sequence))
+                                 + " bases but " + str(len(quality)) + " quality characters")
+            yield name, sequence, quality
+
+"""
+Reads FASTA or FASTQ, depending on whether the first non-empty line starts with
+'>' or '@'.
+
+output: generator yielding (name, sequence) for each record
+"""
+def ReadSequences(Path):
+    with OpenSequenceFile(Path) as handle:
+        first = ''
+        for line in handle:
+            first = line.strip()
+            if first:
+                break
+    if first.startswith('@'):
+        for name, sequence, quality in ReadFastq(Path):
+            yield name, sequence
+    else:
+        yield from ReadFasta(Path)
+
+"""
+Builds the Dna list expected by GreedyMotifSearch, RandomizedMotifSearch and
+GibbsSampler (one string per record, in file order).
+
+input:  Path- path to a FASTA or FASTQ file
+output: list of sequences
+        ex: Dna = ReadDna("upstream250.txt")
+            GreedyMotifSearchWithPseudocounts(Dna, 20, len(Dna))
+"""
+def ReadDna(Path):
+    return [sequence for name, sequence in ReadSequences(Path)]
+
+"""
+Chunked mode for chromosome-sized records: instead of joining a record into one
+string, its sequence is handed out in pieces of Size letters (the last piece of a
+record may be shorter), so memory stays bounded by Size whatever the record length.
+
+input:  Path- path to a FASTA file, and the chunk Size
+output: generator yielding (name, chunk) pairs, in record order; a record with no
+        sequence yields a single empty chunk, so every record of ReadFasta shows up
+        ex: ('chromosome', 'ACGT...') ('chromosome', 'TTAG...') ('plasmid', 'GGCA...')
+"""
+def ReadFastaChunks(Path, Size=1 << 20):
+    for number, name, chunk in _NumberedFastaChunks(Path, Size):
+        yield name, chunk
+
+# Output: (record number, name, chunk) triples, so records that share a name stay apart
+def _NumberedFastaChunks(Path, Size):
+    with OpenSequenceFile(Path) as handle:
+        number = -1
+        name = None
+        buffer = []
+        buffered = 0
+        # whether the current record has handed out a chunk yet
+        started = False
+        for line in handle:
+            line = line.strip()
+            if line.startswith('>'):
+                if name is not None and (buffered or not started):
+                    yield number, name, ''.join(buffer)
+                number += 1
+                name = line[1:]
+                buffer = []
+                buffered = 0
+                started = False
+            elif line and name is not None:
+                buffer.append(line)
+                buffered += len(line)
+                if buffered >= Size:
+                    pending = ''.join(buffer)
+                    for start in range(0, len(pending) - Size + 1, Size):
+                        yield number, name, pending[start:start+Size]
+                    started = True
+                    rest = pending[len(pending) - len(pending) % Size:]
+                    buffer = [rest] if rest else []
+                    buffered = len(rest)
+        if name is not None and (buffered or not started):
+            yield number, name, ''.join(buffer)
+
+"""
+Convenience wrapper around ReadFastaChunks that yields one letter iterator per
+record, suitable for the streaming functions such as ComputingFrequencies.
+The letters of one record must be consumed before moving on to the next. Records
+are told apart by their position in the file, not by name, so it yields exactly
+the records of ReadFasta, empty ones included.
+
+output: generator yielding (name, letters) for each record
+        ex: for name, letters in ReadFastaLetters("genome.fa"):
+                print(name, ComputingFrequencies(letters, 9).Serialize())
+"""
+def ReadFastaLetters(Path, Size=1 << 20):
+    for (number, name), triples in itertools.groupby(_NumberedFastaChunks(Path, Size), lambda triple: triple[:2]):
+        yield name, itertools.chain.from_iterable(chunk for number, name, chunk in triples)
+
+# Dna = ReadDna("upstream250.txt")
+# print(len(Dna), len(Dna[0]))